@@ -0,0 +1,367 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# =========================================================
+# 로컬 가짜 TMDB 서버 (벤치마크/부하 테스트용)
+# - /configuration, /discover/movie, /movie/{id} 를 fixture로 응답
+# - 지연(latency) + 흔들림(jitter) + 429 주입(rate_429, Retry-After) 설정 가능
+# - /movie/{id} 는 append_to_response로 요청한 하위 리소스(videos/images/credits)만 포함
+# - 200 응답에 ETag를 붙이고 If-None-Match가 같으면 304
+# - 엔드포인트별 호출 수/전송 바이트를 집계
+# - fixtures 디렉터리에 configuration.json, discover.json(영화 목록), movie/{id}.json 이 있으면
+#   그 파일을 쓰고, 없으면 seed 기반으로 실제 응답과 비슷한 크기의 데이터를 만들어 씀
+# =========================================================
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+GENRE_IDS = [28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37]
+LANGUAGES = ["en", "en", "en", "ko", "ja", "fr", "es"]
+PAGE_SIZE = 20
+APPENDABLE = ("videos", "images", "credits")
+
+
+def _words(rnd: random.Random, n: int) -> str:
+    vocab = ["movie", "hero", "city", "night", "secret", "love", "war", "dream", "friend", "journey", "light", "storm"]
+    return " ".join(rnd.choice(vocab) for _ in range(n))
+
+
+def make_pool(size: int, seed: int) -> list[dict]:
+    rnd = random.Random(seed)
+    pool = []
+    for i in range(size):
+        mid = 1000 + i
+        lang = rnd.choice(LANGUAGES)
+        pool.append(
+            {
+                "adult": False,
+                "backdrop_path": f"/b{mid}.jpg",
+                "genre_ids": rnd.sample(GENRE_IDS, rnd.randint(1, 3)),
+                "id": mid,
+                "original_language": lang,
+                "original_title": f"Original {mid}",
+                "overview": _words(rnd, 40),
+                "popularity": round(rnd.uniform(1, 800), 3),
+                "poster_path": f"/p{mid}.jpg",
+                "release_date": f"{rnd.randint(1980, 2025)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+                "title": f"{_words(rnd, 2).title()} {mid}",
+                "video": False,
+                "vote_average": round(rnd.uniform(3, 9.5), 1),
+                "vote_count": rnd.randint(0, 20000),
+                "kr_release": lang == "ko" and rnd.random() < 0.9,
+            }
+        )
+    return pool
+
+
+def make_details(movie: dict, seed: int) -> dict:
+    # append_to_response=videos,images,credits 를 포함한 상세 응답과 비슷한 모양/크기
+    rnd = random.Random(seed * 1_000_003 + movie["id"])
+    mid = movie["id"]
+
+    def image(kind: str, i: int) -> dict:
+        return {
+            "aspect_ratio": 0.667 if kind == "poster" else 1.778,
+            "height": 3000,
+            "iso_639_1": rnd.choice(["en", "ko", None]),
+            "file_path": f"/{kind}{mid}_{i}.jpg",
+            "vote_average": round(rnd.uniform(0, 10), 3),
+            "vote_count": rnd.randint(0, 40),
+            "width": 2000,
+        }
+
+    def person(i: int, cast: bool) -> dict:
+        p = {
+            "adult": False,
+            "gender": rnd.randint(0, 2),
+            "id": 100000 + mid * 100 + i,
+            "known_for_department": "Acting" if cast else "Crew",
+            "name": f"Person {mid}-{i}",
+            "original_name": f"Person {mid}-{i}",
+            "popularity": round(rnd.uniform(0, 50), 3),
+            "profile_path": f"/pr{mid}_{i}.jpg",
+            "credit_id": f"{mid:08x}{i:016x}",
+        }
+        if cast:
+            p.update({"cast_id": i, "character": _words(rnd, 2).title(), "order": i})
+        else:
+            p.update({"department": "Production", "job": "Producer"})
+        return p
+
+    keys = ["Trailer", "Teaser", "Featurette", "Clip"]
+    videos = [
+        {
+            "iso_639_1": "en",
+            "iso_3166_1": "US",
+            "name": f"{keys[i % 4]} {i}",
+            "key": f"yt{mid}x{i}",
+            "site": "YouTube",
+            "size": 1080,
+            "type": keys[i % 4],
+            "official": True,
+            "published_at": "2020-01-01T00:00:00.000Z",
+            "id": f"v{mid}{i}",
+        }
+        for i in range(rnd.randint(0, 6))
+    ]
+    d = {k: v for k, v in movie.items() if k not in ("genre_ids", "kr_release")}
+    d.update(
+        {
+            "belongs_to_collection": None,
+            "budget": rnd.randint(0, 200_000_000),
+            "genres": [{"id": g, "name": f"Genre {g}"} for g in movie["genre_ids"]],
+            "homepage": f"https://example.com/{mid}",
+            "imdb_id": f"tt{mid:07d}",
+            "production_companies": [
+                {"id": i, "logo_path": f"/l{i}.png", "name": f"Studio {i}", "origin_country": "US"} for i in range(3)
+            ],
+            "production_countries": [{"iso_3166_1": "US", "name": "United States of America"}],
+            "revenue": rnd.randint(0, 900_000_000),
+            "runtime": rnd.randint(80, 180),
+            "spoken_languages": [{"english_name": "English", "iso_639_1": "en", "name": "English"}],
+            "status": "Released",
+            "tagline": _words(rnd, 6),
+            "videos": {"results": videos},
+            "images": {
+                "backdrops": [image("backdrop", i) for i in range(rnd.randint(10, 40))],
+                "logos": [image("logo", i) for i in range(rnd.randint(0, 10))],
+                "posters": [image("poster", i) for i in range(rnd.randint(10, 40))],
+            },
+            "credits": {
+                "cast": [person(i, True) for i in range(rnd.randint(15, 60))],
+                "crew": [person(i, False) for i in range(rnd.randint(20, 80))],
+            },
+        }
+    )
+    return d
+
+
+class FakeTMDB:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after: float = 1.0,
+        fixtures_dir: str = FIXTURES_DIR,
+        pool_size: int = 4000,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.fixtures_dir = fixtures_dir
+        self.seed = seed
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.bytes_sent: dict[str, int] = {}
+        self.throttled = 0
+        self.not_modified = 0
+
+        self.configuration = self._load_fixture("configuration.json") or {"images": {}}
+        self.pool = self._load_fixture("discover.json") or make_pool(pool_size, seed)
+        self._by_id = {m["id"]: m for m in self.pool}
+
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/3"
+
+    def _load_fixture(self, name: str):
+        path = os.path.join(self.fixtures_dir or "", name)
+        if self.fixtures_dir and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        return None
+
+    def start(self) -> "FakeTMDB":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.bytes_sent.clear()
+            self.throttled = 0
+            self.not_modified = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "total_calls": sum(self.calls.values()),
+                "bytes": dict(self.bytes_sent),
+                "total_bytes": sum(self.bytes_sent.values()),
+                "throttled": self.throttled,
+                "not_modified": self.not_modified,
+            }
+
+    # -----------------------------
+    # 응답 생성
+    # -----------------------------
+    def delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._rnd.uniform(-self.jitter, self.jitter))
+
+    def should_throttle(self) -> bool:
+        with self._lock:
+            hit = self.rate_429 > 0 and self._rnd.random() < self.rate_429
+            self.throttled += hit
+            return hit
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def record(self, endpoint: str, size: int) -> None:
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            self.bytes_sent[endpoint] = self.bytes_sent.get(endpoint, 0) + size
+
+    def discover(self, q: dict) -> dict:
+        genres = [int(g) for g in q.get("with_genres", "").replace("|", ",").split(",") if g]
+        min_votes = int(float(q.get("vote_count.gte", 0)))
+        vmin = float(q.get("vote_average.gte", 0))
+        vmax = float(q.get("vote_average.lte", 10))
+        rows = [
+            m
+            for m in self.pool
+            if all(g in m["genre_ids"] for g in genres)
+            and m["vote_count"] >= min_votes
+            and vmin <= m["vote_average"] <= vmax
+        ]
+        if q.get("with_original_language"):
+            rows = [m for m in rows if m["original_language"] == q["with_original_language"]]
+            if q.get("primary_release_country") == "KR":
+                rows = [m for m in rows if m.get("kr_release")]
+        if q.get("without_original_language"):
+            rows = [m for m in rows if m["original_language"] != q["without_original_language"]]
+        key = "vote_average" if q.get("sort_by", "").startswith("vote_average") else "popularity"
+        rows.sort(key=lambda m: (-m[key], m["id"]))
+        page = max(1, int(q.get("page", 1)))
+        total_pages = max(1, (len(rows) + PAGE_SIZE - 1) // PAGE_SIZE)
+        results = [
+            {k: v for k, v in m.items() if k != "kr_release"} for m in rows[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+        ]
+        return {"page": page, "results": results, "total_pages": total_pages, "total_results": len(rows)}
+
+    def details(self, movie_id: int, append: str = "") -> dict | None:
+        body = self._load_fixture(os.path.join("movie", f"{movie_id}.json"))
+        if body is None:
+            movie = self._by_id.get(movie_id)
+            if movie is None:
+                return None
+            body = make_details(movie, self.seed)
+        # append_to_response로 요청한 하위 리소스만 포함
+        wanted = {a.strip() for a in append.split(",") if a.strip()}
+        return {k: v for k, v in body.items() if k not in APPENDABLE or k in wanted}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeTMDB = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: dict, endpoint: str, headers: dict | None = None) -> None:
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        if status == 200:
+            # 조건부 요청(If-None-Match) 지원: 본문이 같으면 304
+            etag = '"' + hashlib.sha1(raw).hexdigest()[:16] + '"'
+            headers = {**(headers or {}), "ETag": etag}
+            if self.headers.get("If-None-Match") == etag:
+                status, raw = 304, b""
+                self.fake.record_not_modified()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(raw)
+        self.fake.record(endpoint, len(raw))
+
+    def do_GET(self):
+        fake = self.fake
+        url = urlparse(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.removeprefix("/3")
+
+        if path == "/configuration":
+            endpoint = "configuration"
+        elif path == "/discover/movie":
+            endpoint = "discover"
+        elif path.startswith("/movie/"):
+            endpoint = "movie"
+        else:
+            self._send(404, {"status_message": "not found"}, "other")
+            return
+
+        time.sleep(fake.delay())
+        if fake.should_throttle():
+            self._send(429, {"status_message": "rate limited"}, endpoint, {"Retry-After": str(fake.retry_after)})
+            return
+
+        if endpoint == "configuration":
+            self._send(200, fake.configuration, endpoint)
+        elif endpoint == "discover":
+            self._send(200, fake.discover(q), endpoint)
+        else:
+            try:
+                body = fake.details(int(path.rsplit("/", 1)[-1]), q.get("append_to_response", ""))
+            except ValueError:
+                body = None
+            if body is None:
+                self._send(404, {"status_message": "The resource you requested could not be found."}, endpoint)
+            else:
+                self._send(200, body, endpoint)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="로컬 가짜 TMDB 서버를 실행합니다.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="지연 흔들림 ±(초)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율(0~1)")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    fake = FakeTMDB(args.latency, args.jitter, args.rate_429, args.retry_after, args.fixtures, seed=args.seed, port=args.port)
+    print(f"TMDB_API_BASE={fake.base_url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
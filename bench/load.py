@@ -0,0 +1,369 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+# 저장소 루트에서 `python -m bench.load` 으로 실행
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fake_tmdb import FIXTURES_DIR, FakeTMDB  # noqa: E402
+from bench.run import summarize  # noqa: E402
+
+# =========================================================
+# 동시 세션 부하 테스트 (실제 `streamlit run app.py` 프로세스 + websocket 클라이언트, 가짜 TMDB)
+# - 동시 세션 수(--sessions 1,2,4,8 ...)마다 --duration초 동안 세션을 동시에 돌림
+#   · 세션 하나 = websocket 연결 하나: 브라우저처럼 위젯 상태를 보내 rerun을 요청
+#     (위젯이 fragment 안에 있으면 그 fragment만 다시 실행되는 것도 브라우저와 같음)
+#   · 처음 열기 → API Key 입력 → (질문 답 바꾸기 / 평점 슬라이더 / 결과 보기)를
+#     생각 시간(지수 분포, 평균 --think초)을 두고 반복
+#   · 지연 = rerun 요청을 보낸 뒤 script_finished를 받을 때까지
+# - 단계마다: 처리량(조작/초, 결과/초), 조작 종류별 지연 p50/p95/p99, 서버 프로세스 RSS와 증가량,
+#   업스트림 호출 수(결과 한 번당, 엔드포인트별), 429 수, 오류 수
+# - 기본은 단계마다 서버를 새로 띄움(캐시가 빈 상태, RSS 기준점 초기화). --warm이면 서버 하나로 계속
+# - AppTest는 한 프로세스에서 여러 개를 동시에 돌리면 서로의 상태가 섞여 쓰지 않음
+# =========================================================
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# 조작 종류와 비율
+ACTIONS = {"quiz": 0.5, "slider": 0.2, "results": 0.3}
+
+WIDGET_TYPES = ("radio", "slider", "text_input", "button")
+RATING_SLIDER = "최저/최고 평점"
+API_KEY_INPUT = "API Key (v3)"
+RESULTS_BUTTON = "결과 보기"
+
+# rerun 하나를 기다리는 최대 시간(초)
+RUN_TIMEOUT = 60.0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+class AppServer:
+    # `streamlit run app.py`를 별도 프로세스로 띄움(가짜 TMDB를 보도록 환경 변수 설정)
+    def __init__(self, env: dict, workdir: str):
+        self.port = free_port()
+        self.workdir = workdir
+        cmd = [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            APP_PATH,
+            "--server.headless=true",
+            f"--server.port={self.port}",
+            "--server.address=127.0.0.1",
+            "--server.enableXsrfProtection=false",
+            "--server.fileWatcherType=none",
+            "--browser.gatherUsageStats=false",
+        ]
+        self.log = open(os.path.join(workdir, "server.log"), "wb")
+        self.proc = subprocess.Popen(
+            cmd, env=dict(os.environ, **env), cwd=os.path.dirname(APP_PATH), stdout=self.log, stderr=subprocess.STDOUT
+        )
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def wait_ready(self, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"streamlit 서버가 종료됨 (로그: {self.log.name})")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as r:
+                    if r.read() == b"ok":
+                        return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError("streamlit 서버가 준비되지 않음")
+
+    def rss_mb(self) -> float:
+        return rss_mb(self.proc.pid)
+
+    def stop(self) -> None:
+        self.proc.terminate()
+        try:
+            self.proc.wait(10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.log.close()
+
+
+class Session:
+    # 브라우저 한 탭 흉내: 받은 위젯을 라벨로 기억하고, 바꾼 위젯 상태를 모아 rerun_script를 보냄
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets: dict[str, tuple] = {}
+        self.states: dict[str, object] = {}
+        self.exceptions: list[str] = []
+
+    def run(self, fragment_id: str = "") -> None:
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.fragment_id = fragment_id
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        self.ws.send(msg.SerializeToString())
+        # 버튼(trigger)은 한 번만 보냄
+        self.states = {k: v for k, v in self.states.items() if not v.HasField("trigger_value")}
+
+        deadline = time.monotonic() + RUN_TIMEOUT
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(self.ws.recv(timeout=max(0.0, deadline - time.monotonic())))
+            kind = fwd.WhichOneof("type")
+            if kind == "script_finished":
+                if fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in WIDGET_TYPES:
+                    proto = getattr(element, element_type)
+                    self.widgets[proto.label] = (proto, fwd.delta.fragment_id)
+                elif element_type == "exception":
+                    self.exceptions.append(element.exception.message)
+
+    def _state(self, label: str):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        proto, fragment_id = self.widgets[label]
+        state = self.states.setdefault(proto.id, WidgetState(id=proto.id))
+        return proto, state, fragment_id
+
+    def set_text(self, label: str, value: str) -> str:
+        _, state, fragment_id = self._state(label)
+        state.string_value = value
+        return fragment_id
+
+    def set_radio(self, label: str, rnd: random.Random) -> str:
+        proto, state, fragment_id = self._state(label)
+        state.string_value = rnd.choice(list(proto.options))
+        return fragment_id
+
+    def set_range(self, label: str, low: float, high: float) -> str:
+        _, state, fragment_id = self._state(label)
+        state.double_array_value.data[:] = [low, high]
+        return fragment_id
+
+    def click(self, label: str) -> str:
+        _, state, fragment_id = self._state(label)
+        state.trigger_value = True
+        return fragment_id
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = {}
+        self.errors = 0
+        self.error_samples: list[str] = []
+
+    def record(self, action: str, seconds: float) -> None:
+        with self._lock:
+            self.latencies.setdefault(action, []).append(seconds)
+
+    def error(self, message: str) -> None:
+        with self._lock:
+            self.errors += 1
+            if len(self.error_samples) < 5:
+                self.error_samples.append(message)
+
+
+def run_session(url: str, seed: int, stop_at: float, think: float, recorder: Recorder) -> None:
+    from websockets.sync.client import connect
+
+    from scoring import QUESTIONS
+
+    rnd = random.Random(seed)
+    quiz_labels = [q["label"] for q in QUESTIONS]
+    actions, weights = list(ACTIONS), list(ACTIONS.values())
+
+    def timed(action: str, session: Session, fragment_id: str = "") -> None:
+        started = time.perf_counter()
+        seen = len(session.exceptions)
+        session.run(fragment_id)
+        recorder.record(action, time.perf_counter() - started)
+        for message in session.exceptions[seen:]:
+            recorder.error(f"{action}: {message}")
+
+    try:
+        with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=30) as ws:
+            session = Session(ws)
+            timed("open", session)
+            timed("credentials", session, session.set_text(API_KEY_INPUT, f"load-{seed}"))
+            while time.monotonic() < stop_at:
+                pause = rnd.expovariate(1 / think) if think > 0 else 0.0
+                time.sleep(min(pause, max(0.0, stop_at - time.monotonic())))
+                if time.monotonic() >= stop_at:
+                    break
+                action = rnd.choices(actions, weights)[0]
+                if action == "quiz":
+                    fragment_id = session.set_radio(rnd.choice(quiz_labels), rnd)
+                elif action == "slider":
+                    low = round(rnd.uniform(4.0, 7.0), 1)
+                    fragment_id = session.set_range(RATING_SLIDER, low, round(rnd.uniform(low + 1.0, 10.0), 1))
+                else:
+                    fragment_id = session.click(RESULTS_BUTTON)
+                timed(action, session, fragment_id)
+    except Exception as e:
+        recorder.error(f"{type(e).__name__}: {e}")
+
+
+def run_level(server: AppServer, fake: FakeTMDB, sessions: int, duration: float, think: float, seed: int) -> dict:
+    recorder = Recorder()
+    rss_before, stats_before = server.rss_mb(), fake.stats()
+    peak = rss_before
+    started = time.monotonic()
+    stop_at = started + duration
+    threads = [
+        threading.Thread(
+            target=run_session, args=(server.url, seed + i, stop_at, think, recorder), name=f"load-session-{i}"
+        )
+        for i in range(sessions)
+    ]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        peak = max(peak, server.rss_mb())
+        time.sleep(0.2)
+    elapsed = time.monotonic() - started
+    stats_after = fake.stats()
+    rss_after = server.rss_mb()
+
+    interactions = sum(len(v) for k, v in recorder.latencies.items() if k in ACTIONS)
+    results = len(recorder.latencies.get("results", []))
+    calls = stats_after["total_calls"] - stats_before["total_calls"]
+    return {
+        "sessions": sessions,
+        "elapsed_s": round(elapsed, 3),
+        "interactions": interactions,
+        "throughput_per_s": round(interactions / elapsed, 3),
+        "results_per_s": round(results / elapsed, 3),
+        "latency": {
+            "all": summarize([x for k, v in recorder.latencies.items() if k in ACTIONS for x in v]),
+            **{k: summarize(v) for k, v in sorted(recorder.latencies.items())},
+        },
+        "rss_mb": round(rss_after, 1),
+        "rss_peak_mb": round(max(peak, rss_after), 1),
+        "rss_growth_mb": round(rss_after - rss_before, 1),
+        "upstream_calls": calls,
+        "upstream_calls_per_result": round(calls / results, 3) if results else None,
+        "upstream_calls_by_endpoint": {
+            k: v - stats_before["calls"].get(k, 0) for k, v in stats_after["calls"].items()
+        },
+        "throttled": stats_after["throttled"] - stats_before["throttled"],
+        "errors": recorder.errors,
+        "error_samples": recorder.error_samples,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="동시 세션 수를 늘려가며 app.py의 처리량/지연/메모리를 측정합니다.")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="쉼표로 구분한 동시 세션 수 단계")
+    parser.add_argument("--duration", type=float, default=20.0, help="단계마다 실행 시간(초)")
+    parser.add_argument("--think", type=float, default=1.0, help="조작 사이 평균 생각 시간(초)")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 서버 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--warm", action="store_true", help="서버 하나로 모든 단계를 실행(캐시 유지)")
+    parser.add_argument("--rps", type=float, help="앱의 TMDB 초당 요청 상한(기본: 앱 설정 그대로)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="-", help="결과 JSON 경로 (기본: stdout)")
+    args = parser.parse_args(argv)
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    fake = FakeTMDB(args.latency, args.jitter, args.rate_429, 0.2, args.fixtures, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="tmdb-load-")
+    env = {
+        "TMDB_API_BASE": fake.base_url,
+        # 스냅샷 없이 라이브 경로를 측정, 포스터/유사도 색인은 디스크에 쓰지 않음
+        "TMDB_SNAPSHOT_PATH": "",
+        "POSTER_CACHE_DIR": "",
+        "TMDB_SIMILAR_PATH": "",
+    }
+    if args.rps:
+        env.update(TMDB_RATE_LIMIT_RPS=str(args.rps), TMDB_RATE_LIMIT_BURST=str(args.rps))
+
+    def start_server(name: str) -> AppServer:
+        level_dir = os.path.join(workdir, name)
+        shutil.rmtree(level_dir, ignore_errors=True)
+        os.makedirs(level_dir)
+        server_env = dict(
+            env,
+            TMDB_CACHE_PATH=os.path.join(level_dir, "cache.sqlite3"),
+            TMDB_CATALOG_DIR=os.path.join(level_dir, "catalog"),
+        )
+        server = AppServer(server_env, level_dir)
+        server.wait_ready()
+        return server
+
+    out = []
+    server = None
+    with fake:
+        try:
+            for i, sessions in enumerate(levels):
+                if server is None or not args.warm:
+                    if server is not None:
+                        server.stop()
+                    server = start_server(f"level-{i}")
+                level = run_level(server, fake, sessions, args.duration, args.think, args.seed + 1000 * i)
+                out.append(level)
+                lat = level["latency"]["all"]
+                print(
+                    f"{sessions:>3} 세션: {level['throughput_per_s']:.2f} 조작/초, "
+                    f"p50 {lat['p50_ms']:.0f}ms p95 {lat['p95_ms']:.0f}ms p99 {lat['p99_ms']:.0f}ms, "
+                    f"RSS {level['rss_mb']}MB(+{level['rss_growth_mb']}), "
+                    f"업스트림 {level['upstream_calls']}회, 오류 {level['errors']}",
+                    file=sys.stderr,
+                )
+        finally:
+            if server is not None:
+                server.stop()
+
+    result = {
+        "config": {
+            "sessions": levels,
+            "duration": args.duration,
+            "think": args.think,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "rate_429": args.rate_429,
+            "cold": not args.warm,
+            "rps": args.rps,
+            "seed": args.seed,
+        },
+        "levels": out,
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
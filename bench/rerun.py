@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+# 저장소 루트에서 `python -m bench.rerun` 으로 실행
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fake_tmdb import FIXTURES_DIR, FakeTMDB  # noqa: E402
+from bench.run import summarize  # noqa: E402
+
+# =========================================================
+# 위젯 조작 한 번당 rerun 비용 (streamlit AppTest)
+# - 가짜 TMDB 서버로 결과 화면까지 띄운 뒤 질문 답/사이드바 필터를 번갈아 바꿈
+# - app.py가 세션에 기록하는 실행 시간(_timings)으로 비교
+#   · full: 스크립트 전체 실행(fragment로 나누기 전에는 모든 조작이 이 비용)
+#   · quiz / sidebar / results: 해당 fragment만 다시 실행될 때의 비용
+# - 조작 중 업스트림 호출 수(결과를 다시 계산하지 않으므로 추측 prefetch 외에는 0이어야 함)
+# =========================================================
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="위젯 조작 한 번당 rerun 비용을 측정합니다.")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.03, help="가짜 서버 응답 지연(초)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="-", help="결과 JSON 경로 (기본: stdout)")
+    args = parser.parse_args(argv)
+
+    fake = FakeTMDB(args.latency, 0.0, 0.0, 0.2, args.fixtures, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="tmdb-rerun-")
+    os.environ["TMDB_API_BASE"] = fake.base_url
+    os.environ["TMDB_CACHE_PATH"] = os.path.join(workdir, "cache.sqlite3")
+    os.environ["TMDB_CATALOG_DIR"] = os.path.join(workdir, "catalog")
+    # 스냅샷 없이 라이브 경로를 측정, 포스터/유사도 색인은 디스크에 쓰지 않음
+    os.environ["TMDB_SNAPSHOT_PATH"] = ""
+    os.environ["POSTER_CACHE_DIR"] = ""
+    os.environ["TMDB_SIMILAR_PATH"] = ""
+    os.environ["TMDB_RATE_LIMIT_RPS"] = "1000"
+    os.environ["TMDB_RATE_LIMIT_BURST"] = "1000"
+    # 조작마다 추측 prefetch가 업스트림을 부르면 rerun 비용과 섞이므로 끔
+    os.environ["PREFETCH_SESSION_BUDGET"] = "0"
+
+    from streamlit import logger as st_logger
+    from streamlit.testing.v1 import AppTest
+
+    st_logger.set_log_level("error")
+
+    full, parts, calls = [], {"quiz": [], "sidebar": []}, []
+    with fake:
+        at = AppTest.from_file(APP_PATH, default_timeout=60)
+        at.run()
+        at.sidebar.text_input[0].input("bench").run()
+        [b for b in at.button if b.label == "결과 보기"][0].click().run()
+        results_ms = at.session_state["_timings"]["results"]
+
+        for i in range(args.iterations):
+            before = fake.stats()["total_calls"]
+            if i % 2 == 0:
+                radio = at.radio(key="q1")
+                radio.set_value(radio.options[(i // 2 + 1) % len(radio.options)]).run()
+                part = "quiz"
+            else:
+                radio = at.sidebar.radio[0]
+                radio.set_value(radio.options[(i // 2 + 1) % len(radio.options)]).run()
+                part = "sidebar"
+            timings = at.session_state["_timings"]
+            full.append(timings["script"] / 1000)
+            parts[part].append(timings[part] / 1000)
+            calls.append(fake.stats()["total_calls"] - before)
+
+    result = {
+        "config": {"iterations": args.iterations, "latency": args.latency, "seed": args.seed},
+        "results_render_ms": results_ms,
+        "full": summarize(full),
+        "quiz": summarize(parts["quiz"]),
+        "sidebar": summarize(parts["sidebar"]),
+        "upstream_calls_per_interaction": round(sum(calls) / max(1, len(calls)), 3),
+        "exceptions": [e.value for e in at.exception],
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import pickle
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# 저장소 루트에서 `python -m bench.run` 으로 실행
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fake_tmdb import FIXTURES_DIR, FakeTMDB  # noqa: E402
+
+# =========================================================
+# 오프라인 벤치마크
+# - 가짜 TMDB 서버를 띄우고 TMDB_API_BASE를 그쪽으로 돌린 뒤 recommend()를 반복 실행
+# - cold(모든 캐시 비운 상태) / warm(같은 요청을 한 번 돌린 뒤) 각각
+#   결과 페이지 완료 시간과 첫 카드까지의 시간 p50/p95/p99, 추천 1건당 업스트림 호출 수, 캐시 적중률을 JSON으로 출력
+# - refilter: warm 상태에서 사이드바 필터만 바꿨을 때 discover 호출 수
+# - movie_details 한 건당 전송 바이트/캐시 항목 크기(전체 응답 vs slim 레코드)
+# - 엔드포인트별 메모리 캐시 항목 수/바이트/적중률/삭제 수
+# =========================================================
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    xs = sorted(values)
+    k = (len(xs) - 1) * p / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+
+
+def summarize(latencies: list[float]) -> dict:
+    return {
+        "count": len(latencies),
+        "mean_ms": round(1000 * sum(latencies) / max(1, len(latencies)), 3),
+        "p50_ms": round(1000 * percentile(latencies, 50), 3),
+        "p95_ms": round(1000 * percentile(latencies, 95), 3),
+        "p99_ms": round(1000 * percentile(latencies, 99), 3),
+        "max_ms": round(1000 * max(latencies, default=0.0), 3),
+    }
+
+
+def make_workload(n: int, seed: int) -> list[dict]:
+    from recommender import AGE_PRESET
+    from scoring import QUESTIONS, VIEWER_MOOD
+
+    rnd = random.Random(seed)
+    workload = []
+    for _ in range(n):
+        workload.append(
+            {
+                "answers": {q["key"]: rnd.choice(list(q["options"])) for q in QUESTIONS},
+                "viewer_mood": rnd.choice(list(VIEWER_MOOD)),
+                "age_band": rnd.choice(list(AGE_PRESET)),
+                "filters": {
+                    "language": rnd.choice(["ko-KR", "en-US"]),
+                    "sort_by": rnd.choice(["popularity.desc", "vote_average.desc"]),
+                    "country_mode": rnd.choice(["모두", "한국영화", "외국영화"]),
+                },
+            }
+        )
+    return workload
+
+
+def git_version() -> str | None:
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def reset_caches() -> None:
+    import tmdb
+
+    tmdb.get_memory_caches().clear()
+    tmdb.get_supersets().clear()
+    tmdb._configuration_state().update(value=None, updated_at=0.0)
+    disk_cache = tmdb.get_disk_cache()
+    if disk_cache:
+        disk_cache.clear()
+
+
+def run_phase(fake: FakeTMDB, workload: list[dict], cold: bool) -> dict:
+    from recommender import recommend_progressive
+
+    latencies, first_cards, calls, errors = [], [], [], 0
+    for item in workload:
+        if cold:
+            reset_caches()
+        before = fake.stats()["total_calls"]
+        t0 = time.perf_counter()
+        try:
+            _, pending = recommend_progressive(
+                item["answers"],
+                item["viewer_mood"],
+                item["age_band"],
+                item["filters"],
+                api_key="bench",
+                prefetch_posters=False,
+            )
+            # 첫 카드(discover 데이터만으로 그린 시상대/카드)까지의 시간
+            first_cards.append(time.perf_counter() - t0)
+            for _ in pending:
+                pass
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+        calls.append(fake.stats()["total_calls"] - before)
+    out = summarize(latencies)
+    first = summarize(first_cards)
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        out[f"first_card_{key}"] = first[key]
+    out["errors"] = errors
+    out["upstream_calls_per_rec"] = round(sum(calls) / max(1, len(calls)), 3)
+    return out
+
+
+def run_refilter(fake: FakeTMDB, workload: list[dict]) -> dict:
+    # 같은 답에서 사이드바 필터만 바꿨을 때(평점 하한 +0.3, 최소 평가 수 +50) discover 호출 수
+    from recommender import recommend
+
+    latencies, calls = [], []
+    for item in workload:
+        filters = dict(item["filters"], vote_avg_min=6.3, min_vote_count=200)
+        before = fake.stats()["calls"].get("discover", 0)
+        t0 = time.perf_counter()
+        try:
+            recommend(
+                item["answers"], item["viewer_mood"], item["age_band"], filters, api_key="bench", prefetch_posters=False
+            )
+        except Exception:
+            pass
+        latencies.append(time.perf_counter() - t0)
+        calls.append(fake.stats()["calls"].get("discover", 0) - before)
+    out = summarize(latencies)
+    out["discover_calls_per_rec"] = round(sum(calls) / max(1, len(calls)), 3)
+    return out
+
+
+def measure_details_footprint(fake: FakeTMDB, samples: int) -> dict:
+    # movie_details 한 건당 전송 바이트 / 캐시 항목 크기(pickle): 예전 전체 응답 vs slim 레코드
+    import requests
+
+    from tmdb import MovieDetails, slim_details
+
+    full_params = {"language": "ko-KR", "append_to_response": "videos,images,credits", "include_image_language": "en,null,ko"}
+    slim_params = {"language": "ko-KR", "append_to_response": "videos,credits"}
+    totals = {"full_bytes": 0, "slim_bytes": 0, "full_entry_bytes": 0, "slim_entry_bytes": 0}
+    ids = [m["id"] for m in fake.pool[:samples]]
+    with requests.Session() as s:
+        for mid in ids:
+            full = s.get(f"{fake.base_url}/movie/{mid}", params=full_params, timeout=15)
+            slim = s.get(f"{fake.base_url}/movie/{mid}", params=slim_params, timeout=15)
+            totals["full_bytes"] += len(full.content)
+            totals["slim_bytes"] += len(slim.content)
+            totals["full_entry_bytes"] += len(pickle.dumps(full.json()))
+            totals["slim_entry_bytes"] += len(pickle.dumps(MovieDetails.from_dict(slim_details(slim.json()))))
+    n = max(1, len(ids))
+    out = {k.replace("bytes", "bytes_per_movie"): round(v / n, 1) for k, v in totals.items()}
+    out["transfer_reduction"] = round(1 - totals["slim_bytes"] / max(1, totals["full_bytes"]), 4)
+    out["cache_entry_reduction"] = round(1 - totals["slim_entry_bytes"] / max(1, totals["full_entry_bytes"]), 4)
+    return out
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    # 이전 결과 대비 비율(현재/이전). 1보다 작으면 개선
+    delta = {}
+    for phase in ("cold", "warm", "refilter", "details"):
+        for key, value in current.get(phase, {}).items():
+            base = baseline.get(phase, {}).get(key)
+            if isinstance(value, (int, float)) and isinstance(base, (int, float)) and base:
+                delta[f"{phase}.{key}"] = round(value / base, 3)
+    return delta
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="가짜 TMDB 서버로 추천 파이프라인 성능을 측정합니다.")
+    parser.add_argument("-n", "--iterations", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.03, help="가짜 서버 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--rps", type=float, default=1000.0, help="클라이언트 속도 제한(TMDB_RATE_LIMIT_RPS)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--details-samples", type=int, default=50, help="상세 응답 크기 측정에 쓸 영화 수")
+    parser.add_argument("-o", "--output", default="-", help="결과 JSON 경로 (기본: stdout)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    fake = FakeTMDB(args.latency, args.jitter, args.rate_429, args.retry_after, args.fixtures, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="tmdb-bench-")
+    # tmdb 모듈을 import 하기 전에 환경 변수를 정해야 함
+    os.environ["TMDB_API_BASE"] = fake.base_url
+    os.environ["TMDB_CACHE_PATH"] = os.path.join(workdir, "cache.sqlite3")
+    os.environ["TMDB_CATALOG_DIR"] = os.path.join(workdir, "catalog")
+    # 스냅샷 없이 라이브 경로를 측정, 포스터/유사도 색인은 디스크에 쓰지 않음
+    os.environ["TMDB_SNAPSHOT_PATH"] = ""
+    os.environ["POSTER_CACHE_DIR"] = ""
+    os.environ["TMDB_SIMILAR_PATH"] = ""
+    os.environ["TMDB_RATE_LIMIT_RPS"] = str(args.rps)
+    os.environ["TMDB_RATE_LIMIT_BURST"] = str(max(1, int(args.rps)))
+
+    from streamlit import logger as st_logger
+
+    st_logger.set_log_level("error")
+
+    with fake:
+        workload = make_workload(args.iterations, args.seed)
+        cold = run_phase(fake, workload, cold=True)
+
+        # 같은 요청을 한 번 돌려 캐시를 채운 뒤 측정
+        reset_caches()
+        run_phase(fake, workload, cold=False)
+        warm = run_phase(fake, workload, cold=False)
+        refilter = run_refilter(fake, workload)
+        upstream = fake.stats()
+        import tmdb
+
+        http_pool = tmdb.get_http_client().stats()
+        memory_caches = tmdb.get_memory_caches().stats()
+        details = measure_details_footprint(fake, args.details_samples)
+
+    cold_calls = cold["upstream_calls_per_rec"]
+    warm["cache_hit_ratio"] = round(1.0 - warm["upstream_calls_per_rec"] / cold_calls, 4) if cold_calls else None
+    cold["cache_hit_ratio"] = 0.0
+
+    result = {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {
+            "iterations": args.iterations,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "rate_429": args.rate_429,
+            "rps": args.rps,
+            "seed": args.seed,
+        },
+        "cold": cold,
+        "warm": warm,
+        "refilter": refilter,
+        "details": details,
+        "upstream": upstream,
+        "http_pool": http_pool,
+        "memory_caches": memory_caches,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["vs_baseline"] = compare(result, json.load(f))
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import threading
+import time
+
+# =========================================================
+# Circuit breaker (엔드포인트별)
+# - 업스트림 장애(5xx, timeout, 연결 실패, 시간 예산 초과)가 연속 failure_threshold번이면 open
+#   → reset_timeout 동안은 호출하지 않고 바로 실패(CircuitOpen) → 호출 측은 마지막 정상 결과로 응답
+# - reset_timeout이 지나면 half-open: 시험 호출 하나만 보내고, 성공하면 closed / 실패하면 다시 open
+# - 인증 오류(401)·404처럼 요청 자체의 문제는 실패로 세지 않음
+# =========================================================
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+
+
+class UpstreamUnavailable(RuntimeError):
+    # TMDB가 응답하지 못한 경우(장애/시간 초과/차단 중) → 마지막 정상 결과로 대체할 수 있는 실패
+    pass
+
+
+class CircuitOpen(UpstreamUnavailable):
+    pass
+
+
+class DeadlineExceeded(UpstreamUnavailable):
+    # 페이지 시간 예산을 다 써서 요청을 보내지 못함(업스트림 실패로 세지 않음)
+    pass
+
+
+class _Circuit:
+    __slots__ = ("failures", "opened_at", "probing")
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = int(failure_threshold)
+        self.reset_timeout = float(reset_timeout)
+        self._lock = threading.Lock()
+        self._circuits: dict[str, _Circuit] = {}
+        self.trips = 0
+        self.rejected = 0
+
+    def _circuit(self, name: str) -> _Circuit:
+        circuit = self._circuits.get(name)
+        if circuit is None:
+            circuit = self._circuits[name] = _Circuit()
+        return circuit
+
+    def allow(self, name: str) -> bool:
+        # False면 호출하지 말 것(open). half-open이면 한 호출만 통과
+        with self._lock:
+            circuit = self._circuit(name)
+            if circuit.opened_at is None:
+                return True
+            if time.monotonic() - circuit.opened_at >= self.reset_timeout and not circuit.probing:
+                circuit.probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def check(self, name: str) -> None:
+        if not self.allow(name):
+            raise CircuitOpen("TMDB 응답이 불안정해 잠시 요청을 멈췄어요. 잠시 후 다시 시도해 주세요.")
+
+    def record_success(self, name: str) -> None:
+        with self._lock:
+            circuit = self._circuit(name)
+            circuit.failures = 0
+            circuit.opened_at = None
+            circuit.probing = False
+
+    def record_failure(self, name: str) -> None:
+        with self._lock:
+            circuit = self._circuit(name)
+            circuit.failures += 1
+            if circuit.probing or (circuit.opened_at is None and circuit.failures >= self.failure_threshold):
+                if circuit.opened_at is None or circuit.probing:
+                    self.trips += 1
+                circuit.opened_at = time.monotonic()
+            circuit.probing = False
+
+    def release(self, name: str) -> None:
+        # 결과 없이 끝난 호출(예: 시간 예산 초과). 연속 실패로는 세지 않지만 시험 호출이었다면 다시 open
+        with self._lock:
+            circuit = self._circuit(name)
+            if circuit.probing:
+                circuit.probing = False
+                circuit.opened_at = time.monotonic()
+                self.trips += 1
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            circuit = self._circuit(name)
+            if circuit.opened_at is None:
+                return "closed"
+            if time.monotonic() - circuit.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def stats(self) -> dict:
+        names = list(self._circuits)
+        out = {"trips": self.trips, "rejected": self.rejected}
+        out["circuits"] = {name: self.state(name) for name in names}
+        return out
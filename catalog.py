@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import requests
+
+from ratelimit import RateLimiter
+
+# =========================================================
+# 로컬 카탈로그 인덱스
+# - discover 결과를 미리 받아 열(column) 배열로 저장해두고,
+#   사이드바 필터(평점 범위/최소 평가 수/국가)를 벡터 마스크로 적용 + 로컬 정렬
+# - 수집 범위(slice)별로 "이 정렬 값보다 큰 영화는 전부 받았다"는 floor를 기록해
+#   로컬 결과가 TMDB 결과와 같다고 보장될 때만 로컬로 응답(아니면 None → 라이브 API)
+# =========================================================
+DISCOVER_URL = os.environ.get("TMDB_API_BASE", "https://api.themoviedb.org/3").rstrip("/") + "/discover/movie"
+DEFAULT_CATALOG_DIR = os.path.join(".cache", "catalog")
+PAGE_SIZE = 20
+
+# TMDB 영화 장르 id 전체 → 장르 비트마스크의 비트 순서
+TMDB_MOVIE_GENRE_IDS = [28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37]
+GENRE_BIT = {gid: 1 << i for i, gid in enumerate(TMDB_MOVIE_GENRE_IDS)}
+
+SORT_KEYS = {"popularity.desc": "popularity", "vote_average.desc": "vote_average"}
+# 수집 시 최소 평가 수: 이보다 낮은 min_vote_count 요청은 로컬로 보장할 수 없어 라이브로 보냄
+INGEST_MIN_VOTE_COUNT = 50
+
+# 수집 범위: "all" = 국가 제한 없음, "kr" = 앱의 한국영화 모드와 같은 파라미터
+SCOPE_PARAMS = {
+    "all": {},
+    "kr": {"with_original_language": "ko", "region": "KR", "primary_release_country": "KR"},
+}
+
+
+def catalog_path(language: str, catalog_dir: str = DEFAULT_CATALOG_DIR) -> str:
+    return os.path.join(catalog_dir, f"catalog_{language}.npz")
+
+
+def genre_mask(genre_ids) -> int:
+    mask = 0
+    for gid in genre_ids or []:
+        mask |= GENRE_BIT.get(int(gid), 0)
+    return mask
+
+
+def slice_key(genre_id: int, sort_by: str, scope: str) -> str:
+    return f"{genre_id}|{sort_by}|{scope}"
+
+
+class Catalog:
+    def __init__(self, columns: dict, meta: dict):
+        self.ids = columns["ids"]
+        self.genre_mask = columns["genre_mask"]
+        self.vote_average = columns["vote_average"]
+        self.vote_count = columns["vote_count"]
+        self.popularity = columns["popularity"]
+        self.original_language = columns["original_language"]
+        self.kr_release = columns["kr_release"]
+        self.title = columns["title"]
+        self.poster_path = columns["poster_path"]
+        self.meta = meta
+        self.slices = meta.get("slices") or {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, path: str) -> "Catalog":
+        with np.load(path, allow_pickle=False) as z:
+            columns = {k: z[k] for k in z.files if k != "meta"}
+            meta = json.loads(str(z["meta"]))
+        return cls(columns, meta)
+
+    def save(self, path: str) -> None:
+        # 임시 파일에 쓴 뒤 교체 → 앱이 읽는 도중 반쯤 쓰인 파일을 보지 않음
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}.npz"
+        np.savez(
+            tmp,
+            ids=self.ids,
+            genre_mask=self.genre_mask,
+            vote_average=self.vote_average,
+            vote_count=self.vote_count,
+            popularity=self.popularity,
+            original_language=self.original_language,
+            kr_release=self.kr_release,
+            title=self.title,
+            poster_path=self.poster_path,
+            meta=np.array(json.dumps(self.meta, ensure_ascii=False)),
+        )
+        os.replace(tmp, path)
+
+    def _floor(self, genre_ids: list[int], sort_by: str, scope: str) -> float | None:
+        # 요청 장르 중 하나의 slice만 충분히 받았어도 "모든 장르 포함" 영화는 그 slice에 다 들어있음
+        floors = []
+        for gid in genre_ids:
+            info = self.slices.get(slice_key(gid, sort_by, scope))
+            if info is not None:
+                floors.append(float("-inf") if info["exhausted"] else info["floor"])
+        return min(floors) if floors else None
+
+    def query(
+        self,
+        with_genres: list[int],
+        sort_by: str,
+        page: int,
+        min_vote_count: int,
+        vote_avg_min: float,
+        vote_avg_max: float,
+        country_mode: str,
+    ) -> list[dict] | None:
+        if sort_by not in SORT_KEYS or not with_genres or int(min_vote_count) < INGEST_MIN_VOTE_COUNT:
+            return None
+        if any(int(g) not in GENRE_BIT for g in with_genres):
+            return None
+        scope = "kr" if country_mode == "한국영화" else "all"
+        floor = self._floor([int(g) for g in with_genres], sort_by, scope)
+        if floor is None:
+            return None
+
+        want = genre_mask(with_genres)
+        mask = (self.genre_mask & want) == want
+        mask &= self.vote_count >= int(min_vote_count)
+        # 저장된 값과 같은 float32로 비교해야 경계값(예: 6.1)이 TMDB 결과와 일치
+        vmin, vmax = np.float32(vote_avg_min), np.float32(vote_avg_max)
+        mask &= (self.vote_average >= vmin) & (self.vote_average <= vmax)
+        if country_mode == "한국영화":
+            mask &= self.kr_release
+        elif country_mode == "외국영화":
+            mask &= self.original_language != "ko"
+
+        key = getattr(self, SORT_KEYS[sort_by])
+        idx = np.flatnonzero(mask)
+        # floor보다 큰 값만 "빠짐없이 수집됨"이 보장됨
+        idx = idx[key[idx] > floor]
+        start, stop = (int(page) - 1) * PAGE_SIZE, int(page) * PAGE_SIZE
+        if len(idx) < stop and floor != float("-inf"):
+            return None
+        order = np.lexsort((self.ids[idx], -key[idx]))
+        return [self.record(i) for i in idx[order][start:stop]]
+
+    def record(self, i: int) -> dict:
+        # discover 응답의 영화 항목과 같은 모양으로 반환
+        return {
+            "id": int(self.ids[i]),
+            "title": str(self.title[i]),
+            "vote_average": float(self.vote_average[i]),
+            "vote_count": int(self.vote_count[i]),
+            "popularity": float(self.popularity[i]),
+            "original_language": str(self.original_language[i]),
+            "poster_path": str(self.poster_path[i]) or None,
+            "genre_ids": [gid for gid, bit in GENRE_BIT.items() if int(self.genre_mask[i]) & bit],
+        }
+
+
+# =========================================================
+# Ingest (수집)
+# =========================================================
+def ingest(fetch, language: str, genre_ids: list[int], pages: int, log=None) -> Catalog:
+    # fetch(params) -> discover 응답(dict)
+    movies: dict[int, dict] = {}
+    kr_ids: set[int] = set()
+    slices = {}
+    for scope, scope_params in SCOPE_PARAMS.items():
+        for sort_by, key in SORT_KEYS.items():
+            for gid in genre_ids:
+                floor, exhausted, count = float("inf"), False, 0
+                for page in range(1, pages + 1):
+                    params = {
+                        "with_genres": str(gid),
+                        "language": language,
+                        "sort_by": sort_by,
+                        "page": page,
+                        "include_adult": False,
+                        "vote_count.gte": INGEST_MIN_VOTE_COUNT,
+                        **scope_params,
+                    }
+                    data = fetch(params)
+                    results = data.get("results") or []
+                    for m in results:
+                        if not m.get("id"):
+                            continue
+                        movies[int(m["id"])] = m
+                        if scope == "kr":
+                            kr_ids.add(int(m["id"]))
+                        floor = min(floor, float(m.get(key) or 0.0))
+                    count += len(results)
+                    if page >= int(data.get("total_pages") or 0) or len(results) < PAGE_SIZE:
+                        exhausted = True
+                        break
+                slices[slice_key(gid, sort_by, scope)] = {
+                    "floor": floor if count else 0.0,
+                    "exhausted": exhausted,
+                    "count": count,
+                }
+                if log:
+                    log(f"{slice_key(gid, sort_by, scope)}: {count}편 (누적 {len(movies)}편)")
+
+    ids = np.array(sorted(movies), dtype=np.int64)
+    rows = [movies[int(i)] for i in ids]
+    columns = {
+        "ids": ids,
+        "genre_mask": np.array([genre_mask(m.get("genre_ids")) for m in rows], dtype=np.uint32),
+        "vote_average": np.array([float(m.get("vote_average") or 0.0) for m in rows], dtype=np.float32),
+        "vote_count": np.array([int(m.get("vote_count") or 0) for m in rows], dtype=np.int32),
+        "popularity": np.array([float(m.get("popularity") or 0.0) for m in rows], dtype=np.float32),
+        "original_language": np.array([m.get("original_language") or "" for m in rows], dtype="U8"),
+        "kr_release": np.array([int(i) in kr_ids for i in ids], dtype=bool),
+        "title": np.array([m.get("title") or "" for m in rows], dtype=str),
+        "poster_path": np.array([m.get("poster_path") or "" for m in rows], dtype=str),
+    }
+    # float32로 저장한 값과 floor 비교가 어긋나지 않도록 floor도 float32로 맞춤
+    for info in slices.values():
+        info["floor"] = float(np.float32(info["floor"]))
+    meta = {"language": language, "built_at": time.time(), "pages": pages, "slices": slices}
+    return Catalog(columns, meta)
+
+
+def make_fetcher(api_key: str | None, v4_token: str | None, rate: float, burst: int):
+    session = requests.Session()
+    limiter = RateLimiter(rate, burst)
+    headers = {"Accept": "application/json"}
+    if v4_token:
+        headers["Authorization"] = f"Bearer {v4_token}"
+
+    def fetch(params: dict) -> dict:
+        params = dict(params)
+        if api_key and not v4_token:
+            params["api_key"] = api_key
+        limiter.acquire()
+        r = session.get(DISCOVER_URL, params=params, headers=headers, timeout=15)
+        r.raise_for_status()
+        return r.json()
+
+    return fetch
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TMDB discover 결과로 로컬 카탈로그를 만듭니다.")
+    parser.add_argument("--language", action="append", help="여러 번 지정 가능 (기본: ko-KR, en-US)")
+    parser.add_argument("--genres", default=",".join(str(g) for g in TMDB_MOVIE_GENRE_IDS), help="쉼표로 구분한 장르 id")
+    parser.add_argument("--pages", type=int, default=5, help="slice마다 받을 페이지 수")
+    parser.add_argument("--out-dir", default=os.environ.get("TMDB_CATALOG_DIR", DEFAULT_CATALOG_DIR))
+    parser.add_argument("--rps", type=float, default=float(os.environ.get("TMDB_RATE_LIMIT_RPS", "20")))
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("TMDB_API_KEY")
+    v4_token = os.environ.get("TMDB_V4_TOKEN")
+    if not api_key and not v4_token:
+        print("TMDB_API_KEY 또는 TMDB_V4_TOKEN 환경 변수를 설정해 주세요.", file=sys.stderr)
+        return 2
+
+    fetch = make_fetcher(api_key, v4_token, args.rps, max(1, int(args.rps)))
+    genre_ids = [int(g) for g in args.genres.split(",") if g.strip()]
+    for language in args.language or ["ko-KR", "en-US"]:
+        catalog = ingest(fetch, language, genre_ids, args.pages, log=print)
+        path = catalog_path(language, args.out_dir)
+        catalog.save(path)
+        print(f"{path}: {len(catalog)}편 저장")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# =========================================================
+# 공용 HTTP 클라이언트 (모든 세션/스레드가 한 프로세스에서 공유)
+# - 커넥션 풀 크기, 호스트별 동시 요청 수, keep-alive, 연결/읽기 timeout을 설정으로 조정
+# - 호스트별 슬롯(semaphore)을 기다린 시간과 포화(빈 슬롯이 없어 기다린 횟수)를 집계
+#   → 풀이 병목인지 stats()로 확인
+# =========================================================
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_PER_HOST_LIMIT = 32
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+
+
+class PooledClient:
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        keepalive: bool = True,
+        retry: Retry | None = None,
+    ):
+        self.pool_maxsize = int(pool_maxsize)
+        self.per_host_limit = int(per_host_limit)
+        self.timeout = (float(connect_timeout), float(read_timeout))
+        self.keepalive = keepalive
+        self.session = requests.Session()
+        # 풀이 꽉 차도 block하지 않음(슬롯 대기는 아래 semaphore가 담당, 대기 시간을 잴 수 있게)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=False,
+            max_retries=retry if retry is not None else 0,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.saturated = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def get(self, url: str, params: dict | None = None, headers: dict | None = None, timeout=None) -> requests.Response:
+        slot = self._slot(url)
+        t0 = time.monotonic()
+        waited = not slot.acquire(blocking=False)
+        if waited:
+            slot.acquire()
+        wait = time.monotonic() - t0
+        with self._lock:
+            self.requests += 1
+            self.saturated += waited
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        headers = dict(headers or {})
+        if not self.keepalive:
+            headers["Connection"] = "close"
+        try:
+            return self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+        except requests.RequestException:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            slot.release()
+            with self._lock:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "per_host_limit": self.per_host_limit,
+                "pool_maxsize": self.pool_maxsize,
+                "saturated": self.saturated,
+                "saturation_ratio": round(self.saturated / self.requests, 4) if self.requests else 0.0,
+                "wait_total_s": round(self.wait_total, 4),
+                "wait_avg_ms": round(1000 * self.wait_total / self.requests, 3) if self.requests else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max, 3),
+            }
+
+
+# =========================================================
+# Hedged requests
+# - 엔드포인트별 최근 응답 시간의 p95가 지나도 응답이 없으면 같은 GET을 한 번 더 보내고
+#   먼저 도착한 성공 응답(2xx/304)을 씀. 5xx/429/예외는 다른 쪽을 기다림
+# - 최근 표본이 모자라면 hedge하지 않음 / 전체 요청 중 hedge 비율을 max_ratio 이하로 제한
+# - 주 요청용 스레드가 모두 쓰이는 중이면 hedge 없이 호출한 스레드에서 보냄
+#   → 동시 요청 수는 PooledClient의 호스트별 한도만 제한(hedge 풀은 hedge 요청만 제한)
+# =========================================================
+HEDGE_PRIMARY_WORKERS = 256
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.02
+HEDGE_MAX_RATIO = 0.1
+
+
+class Hedger:
+    def __init__(
+        self,
+        workers: int = DEFAULT_POOL_MAXSIZE,
+        primary_workers: int = HEDGE_PRIMARY_WORKERS,
+        window: int = HEDGE_WINDOW,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        min_delay: float = HEDGE_MIN_DELAY,
+        max_ratio: float = HEDGE_MAX_RATIO,
+    ):
+        self.window = int(window)
+        self.min_samples = int(min_samples)
+        self.min_delay = float(min_delay)
+        self.max_ratio = float(max_ratio)
+        self.primary_workers = int(primary_workers)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge")
+        self._primary_pool = ThreadPoolExecutor(max_workers=self.primary_workers, thread_name_prefix="hedge-primary")
+        self._primaries = 0
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def delay(self, endpoint: str) -> float | None:
+        # hedge를 보내기까지 기다릴 시간(최근 p95). 표본이 모자라면 None
+        with self._lock:
+            samples = list(self._samples.get(endpoint) or ())
+        if len(samples) < self.min_samples:
+            return None
+        samples.sort()
+        return max(self.min_delay, samples[int(0.95 * (len(samples) - 1))])
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.max_ratio * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def run(self, endpoint: str, fn, deadline: float | None = None):
+        # fn()은 멱등(GET)이어야 함. 이긴 쪽의 결과를 돌려주고 응답 시간을 기록
+        started = time.monotonic()
+        delay = self.delay(endpoint)
+        with self._lock:
+            self.calls += 1
+            direct = (
+                delay is None
+                or (deadline is not None and started + delay >= deadline)
+                or self._primaries >= self.primary_workers
+            )
+            if not direct:
+                self._primaries += 1
+        if direct:
+            result = fn()
+            self.record(endpoint, time.monotonic() - started)
+            return result
+
+        primary = self._primary_pool.submit(self._run_primary, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._allow():
+            result = primary.result()
+            self.record(endpoint, time.monotonic() - started)
+            return result
+
+        hedge = self._pool.submit(fn)
+        pending, failed = {primary, hedge}, []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in done if f.exception() is None and _is_success(f.result())), None)
+            if winner is None:
+                failed += done
+                continue
+            # 진 쪽 응답은 도착하는 대로 닫음(커넥션 반환)
+            for f in pending:
+                f.add_done_callback(_close_response)
+            for f in failed + [f for f in done if f is not winner]:
+                _close_response(f)
+            if winner is hedge:
+                with self._lock:
+                    self.hedge_wins += 1
+            self.record(endpoint, time.monotonic() - started)
+            return winner.result()
+        # 둘 다 실패: 주 요청의 결과(응답 또는 예외)를 돌려줌
+        _close_response(hedge)
+        return primary.result()
+
+    def _run_primary(self, fn):
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._primaries -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedge_ratio": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+            }
+            endpoints = list(self._samples)
+        delays = {e: self.delay(e) for e in endpoints}
+        out["hedge_delay_ms"] = {e: round(1000 * d, 3) for e, d in delays.items() if d is not None}
+        return out
+
+
+def _is_success(result) -> bool:
+    # 2xx/304만 이긴 응답으로 봄(5xx/429가 더 늦은 200을 이기지 않도록)
+    status = getattr(result, "status_code", 200)
+    return 200 <= status < 300 or status == 304
+
+
+def _close_response(future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    if hasattr(future.result(), "close"):
+        future.result().close()
@@ -0,0 +1,172 @@
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# =========================================================
+# 메모리 상한이 있는 응답 캐시 (st.cache_data 대신 TMDB 조회 함수에 사용)
+# - 엔드포인트(함수)마다 바이트 예산(max_bytes)과 최대 항목 수(max_entries), TTL, 교체 정책(lru/lfu)
+# - 항목 크기는 저장할 때 한 번 추정(sys.getsizeof를 컨테이너 안까지 합산)
+# - 엔드포인트별 항목 수/바이트/적중/미스/삭제 수를 stats()로 집계 → 파드 메모리 산정에 사용
+# - st.cache_data처럼 '_'로 시작하는 인자는 키에서 뺌(인증 정보, 우선순위)
+# - 값은 복사하지 않고 공유하므로 호출 측은 반환값을 수정하지 않아야 함
+# =========================================================
+POLICIES = ("lru", "lfu")
+
+
+def approx_size(value, _seen: set | None = None) -> int:
+    # 대략적인 메모리 사용량(바이트). 같은 객체는 한 번만 셈
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(k, seen) + approx_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approx_size(v, seen) for v in value)
+    elif hasattr(value, "__slots__"):
+        size += sum(approx_size(getattr(value, k, None), seen) for k in value.__slots__)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "hits")
+
+    def __init__(self, value, size: int, expires_at: float):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.hits = 0
+
+
+class BoundedCache:
+    def __init__(self, name: str, max_bytes: int, max_entries: int, ttl: float | None = None, policy: str = "lru"):
+        if policy not in POLICIES:
+            raise ValueError(f"알 수 없는 캐시 정책: {policy}")
+        self.name = name
+        self.max_bytes = int(max_bytes)
+        self.max_entries = int(max_entries)
+        self.ttl = ttl
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._items: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.rejected = 0
+
+    def get(self, key) -> tuple[bool, object]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(key)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            entry.hits += 1
+            self._items.move_to_end(key)
+            return True, entry.value
+
+    def set(self, key, value) -> None:
+        size = approx_size(value)
+        expires_at = time.monotonic() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            # 혼자서 예산을 넘는 값은 저장하지 않음(다른 항목을 전부 밀어내지 않도록)
+            if size > self.max_bytes:
+                self.rejected += 1
+                return
+            self._items[key] = _Entry(value, size, expires_at)
+            self.bytes += size
+            self._evict(exclude=key)
+
+    def _remove(self, key) -> None:
+        entry = self._items.pop(key)
+        self.bytes -= entry.size
+
+    def _evict(self, exclude) -> None:
+        # lru: 가장 오래 안 쓴 항목부터 / lfu: 가장 적게 쓴 항목부터(같으면 오래 안 쓴 것)
+        # 만료된 항목은 조회할 때 지움(오래 안 쓴 항목이라 lru에서는 먼저 밀려남)
+        while self.bytes > self.max_bytes or len(self._items) > self.max_entries:
+            candidates = (k for k in self._items if k != exclude)
+            if self.policy == "lfu":
+                victim = min(candidates, key=lambda k: self._items[k].hits, default=None)
+            else:
+                victim = next(candidates, None)
+            if victim is None:
+                return
+            self._remove(victim)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "policy": self.policy,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "rejected": self.rejected,
+            }
+
+
+class CacheRegistry:
+    # 엔드포인트 이름 → BoundedCache (limits: 이름 → {"max_bytes", "max_entries", "ttl", "policy"})
+    def __init__(self, limits: dict[str, dict]):
+        self._caches = {name: BoundedCache(name, **cfg) for name, cfg in limits.items()}
+
+    def cache(self, name: str) -> BoundedCache:
+        return self._caches[name]
+
+    def clear(self) -> None:
+        for cache in self._caches.values():
+            cache.clear()
+
+    def stats(self) -> dict:
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
+
+def memoize(get_registry, name: str):
+    # get_registry(): 호출할 때마다 프로세스 공용 CacheRegistry를 돌려주는 함수(st.cache_resource 등)
+    def decorator(fn):
+        sig = inspect.signature(fn)
+        keyed = [p for p in sig.parameters if not p.startswith("_")]
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments[p] for p in keyed)
+            cache = get_registry().cache(name)
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = fn(*args, **kwargs)
+            cache.set(key, value)
+            return value
+
+        wrapper.clear = lambda: get_registry().cache(name).clear()
+        return wrapper
+
+    return decorator
@@ -0,0 +1,268 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+# =========================================================
+# 단계별 지연 시간 계측 (프로세스 내 히스토그램/카운터 + Prometheus 텍스트 형식 내보내기)
+# - span(name, **labels): with 블록 시간을 히스토그램에 기록, 블록 안에서 tag()로 라벨 추가
+#   (예: tmdb_get의 endpoint/status/retries/cache)
+# - 수집기(register_collector): 내보낼 때 캐시/HTTP 풀 같은 객체의 현재 값을 함께 출력
+# - 내보내기: TMDB_METRICS_PORT(127.0.0.1의 /metrics) 또는 TMDB_METRICS_FILE(주기적으로 파일 교체)
+# - 꺼져 있으면(TMDB_METRICS, PORT, FILE 모두 없음) span()은 아무것도 하지 않는 공용 객체를 돌려줌
+# =========================================================
+ENABLED = bool(
+    os.environ.get("TMDB_METRICS", "0") != "0"
+    or os.environ.get("TMDB_METRICS_PORT")
+    or os.environ.get("TMDB_METRICS_FILE")
+)
+
+# 히스토그램 구간 상한(초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 파일로 내보낼 때 다시 쓰는 간격(초)
+EXPORT_INTERVAL = 15.0
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(BUCKETS) and value > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        # 구간 안에서 선형 보간한 근사값
+        if not self.count:
+            return 0.0
+        rank, seen, lower = q * self.count, 0, 0.0
+        for i, n in enumerate(self.counts):
+            upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+            if n and seen + n >= rank:
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper
+        return BUCKETS[-1]
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    items = key + extra
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, tuple], _Histogram] = {}
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._collectors = []
+
+    def observe(self, name: str, value: float, labels: dict) -> None:
+        key = (name, _labels_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = _Histogram()
+            hist.observe(value)
+
+    def inc(self, name: str, labels: dict, amount: float = 1.0) -> None:
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def register_collector(self, fn) -> None:
+        # fn() -> [(이름, "gauge"|"counter", 라벨 dict, 값), ...]
+        with self._lock:
+            if fn not in self._collectors:
+                self._collectors.append(fn)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        # Prometheus 텍스트 형식(0.0.4)
+        with self._lock:
+            histograms = {k: (list(h.counts), h.sum, h.count) for k, h in self._histograms.items()}
+            counters = dict(self._counters)
+            collectors = list(self._collectors)
+
+        lines, typed = [], set()
+        for (name, key), (counts, total, count) in sorted(histograms.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for i, n in enumerate(counts):
+                cumulative += n
+                le = repr(BUCKETS[i]) if i < len(BUCKETS) else "+Inf"
+                lines.append(f"{name}_bucket{_format_labels(key, (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(key)} {count}")
+        for (name, key), value in sorted(counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(key)} {value:g}")
+        for fn in collectors:
+            try:
+                samples = fn()
+            except Exception:
+                continue
+            for name, kind, labels, value in samples:
+                if name not in typed:
+                    lines.append(f"# TYPE {name} {kind}")
+                    typed.add(name)
+                lines.append(f"{name}{_format_labels(_labels_key(labels))} {float(value):g}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> list[dict]:
+        # 디버그 패널용: 히스토그램마다 횟수/평균/p50/p95(ms, 구간 근사)
+        with self._lock:
+            items = sorted(self._histograms.items())
+            rows = []
+            for (name, key), hist in items:
+                rows.append(
+                    {
+                        "metric": name,
+                        "labels": ", ".join(f"{k}={v}" for k, v in key),
+                        "count": hist.count,
+                        "mean_ms": round(1000 * hist.sum / hist.count, 3) if hist.count else 0.0,
+                        "p50_ms": round(1000 * hist.quantile(0.5), 3),
+                        "p95_ms": round(1000 * hist.quantile(0.95), 3),
+                    }
+                )
+            return rows
+
+
+REGISTRY = Registry()
+
+
+class Span:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+        self.started = 0.0
+
+    def tag(self, **labels) -> None:
+        self.labels.update(labels)
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None:
+            self.labels["error"] = exc_type.__name__
+        REGISTRY.observe(self.name, time.perf_counter() - self.started, self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def tag(self, **labels) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **labels):
+    return Span(name, labels) if ENABLED else _NOOP
+
+
+def inc(name: str, amount: float = 1.0, **labels) -> None:
+    if ENABLED:
+        REGISTRY.inc(name, labels, amount)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    if ENABLED:
+        REGISTRY.observe(name, value, labels)
+
+
+# =========================================================
+# Export (/metrics HTTP 또는 파일)
+# =========================================================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def write_metrics_file(path: str) -> None:
+    # 임시 파일에 쓴 뒤 교체 → node_exporter textfile collector 등이 반쯤 쓰인 파일을 읽지 않음
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp, path)
+
+
+@st.cache_resource(show_spinner=False)
+def get_exporter() -> dict | None:
+    # 프로세스당 한 번 내보내기 시작 (계측이 꺼져 있으면 None)
+    if not ENABLED:
+        return None
+    out = {}
+    port = os.environ.get("TMDB_METRICS_PORT")
+    if port:
+        server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        out["server"] = server
+    path = os.environ.get("TMDB_METRICS_FILE")
+    if path:
+
+        def loop() -> None:
+            while True:
+                time.sleep(EXPORT_INTERVAL)
+                try:
+                    write_metrics_file(path)
+                except OSError:
+                    pass
+
+        threading.Thread(target=loop, name="metrics-file", daemon=True).start()
+        out["file"] = path
+    return out
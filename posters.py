@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import streamlit as st
+from PIL import Image
+
+# =========================================================
+# 포스터 이미지 캐시 + 썸네일
+# - poster_path마다 원본(w500)을 한 번만 받아 레이아웃별 크기로 줄여 디스크에 저장
+# - discover 직후 후보 포스터를 백그라운드로 미리 받아둠(prefetch)
+# - 디스크 예산(max_bytes) 초과 시 가장 오래 안 쓴 파일부터 삭제(LRU, 파일 mtime 기준)
+# - 파일 이름이 poster_path 기준으로 고정이라 긴 캐시 헤더(immutable)로 서빙 가능
+#   (POSTER_BASE_URL을 정하면 `python posters.py serve`가 띄운 서버 URL을, 아니면 로컬 파일 경로를 반환)
+# =========================================================
+DEFAULT_POSTER_DIR = os.path.join(".cache", "posters")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+SOURCE_SIZE = "w500"
+
+# 레이아웃별 변형: 가로 픽셀 + 로컬 파일이 아직 없을 때 쓸 TMDB 크기
+VARIANTS = {
+    "grid": {"width": 300, "tmdb_size": "w342"},
+    "podium": {"width": 460, "tmdb_size": "w500"},
+}
+JPEG_QUALITY = 82
+CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+# 읽을 때마다 mtime을 갱신하지 않도록 하는 간격(초)
+TOUCH_INTERVAL = 60.0
+
+
+def poster_key(poster_path: str) -> str:
+    return hashlib.sha1(poster_path.encode("utf-8")).hexdigest()[:20]
+
+
+class PosterCache:
+    def __init__(self, root: str = DEFAULT_POSTER_DIR, max_bytes: int = DEFAULT_MAX_BYTES, base_url: str | None = None):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self._lock = threading.Lock()
+        self._pending: dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="poster")
+        self._session = requests.Session()
+        for variant in VARIANTS:
+            os.makedirs(os.path.join(root, variant), exist_ok=True)
+        self._total = self._scan_total()
+        self.downloads = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _file(self, poster_path: str, variant: str) -> str:
+        return os.path.join(self.root, variant, f"{poster_key(poster_path)}.jpg")
+
+    def _scan_total(self) -> int:
+        total = 0
+        for variant in VARIANTS:
+            with os.scandir(os.path.join(self.root, variant)) as it:
+                total += sum(e.stat().st_size for e in it if e.is_file())
+        return total
+
+    # -----------------------------
+    # 다운로드 + 리사이즈
+    # -----------------------------
+    def _fetch(self, source_url: str, poster_path: str) -> None:
+        r = self._session.get(source_url, timeout=15)
+        r.raise_for_status()
+        with self._lock:
+            self.downloads += 1
+        with Image.open(io.BytesIO(r.content)) as img:
+            img = img.convert("RGB")
+            for variant, spec in VARIANTS.items():
+                out = img
+                if img.width > spec["width"]:
+                    height = round(img.height * spec["width"] / img.width)
+                    out = img.resize((spec["width"], height), Image.LANCZOS)
+                buf = io.BytesIO()
+                out.save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                self._write(self._file(poster_path, variant), buf.getvalue())
+        self._evict()
+
+    def _write(self, path: str, data: bytes) -> None:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        old = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+        with self._lock:
+            self._total += len(data) - old
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+        # 다른 프로세스도 같은 디렉터리를 쓰므로 실제 파일 기준으로 다시 계산
+        files = []
+        for variant in VARIANTS:
+            with os.scandir(os.path.join(self.root, variant)) as it:
+                files += [(e.stat().st_mtime, e.stat().st_size, e.path) for e in it if e.name.endswith(".jpg")]
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._total = total
+            self.evictions += evicted
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def prefetch(self, image_base_url: str, poster_paths) -> None:
+        # image_base_url 예: "https://image.tmdb.org/t/p/"
+        for poster_path in poster_paths:
+            if not poster_path or os.path.exists(self._file(poster_path, "grid")):
+                continue
+            with self._lock:
+                if poster_path in self._pending:
+                    continue
+                future = self._pool.submit(self._fetch, f"{image_base_url}{SOURCE_SIZE}{poster_path}", poster_path)
+                self._pending[poster_path] = future
+            future.add_done_callback(lambda _f, p=poster_path: self._done(p))
+
+    def _done(self, poster_path: str) -> None:
+        with self._lock:
+            self._pending.pop(poster_path, None)
+
+    def image(self, poster_path: str | None, variant: str, wait: float = 0.0) -> str | None:
+        # 캐시된 변형의 URL(또는 로컬 경로). 없으면 None → 호출 측에서 TMDB URL 사용
+        if not poster_path:
+            return None
+        path = self._file(poster_path, variant)
+        if not os.path.exists(path) and wait > 0:
+            with self._lock:
+                future = self._pending.get(poster_path)
+            if future is not None:
+                try:
+                    future.result(timeout=wait)
+                except Exception:
+                    pass
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        now = time.time()
+        if now - mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        if self.base_url:
+            return f"{self.base_url}/{variant}/{os.path.basename(path)}"
+        return path
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "pending": len(self._pending),
+                "downloads": self.downloads,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_poster_cache() -> PosterCache | None:
+    # 프로세스 공용 포스터 캐시 (POSTER_CACHE_DIR="" 이면 비활성화)
+    root = os.environ.get("POSTER_CACHE_DIR", DEFAULT_POSTER_DIR)
+    if not root:
+        return None
+    max_mb = float(os.environ.get("POSTER_CACHE_MAX_MB", "200"))
+    return PosterCache(root, int(max_mb * 1024 * 1024), os.environ.get("POSTER_BASE_URL") or None)
+
+
+# =========================================================
+# 로컬 포스터 서버 (긴 캐시 헤더)
+# =========================================================
+class _PosterHandler(SimpleHTTPRequestHandler):
+    def end_headers(self):
+        self.send_header("Cache-Control", f"public, max-age={CACHE_MAX_AGE}, immutable")
+        super().end_headers()
+
+    def list_directory(self, path):
+        self.send_error(404)
+        return None
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="포스터 캐시 디렉터리를 긴 캐시 헤더로 서빙합니다.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=8600)
+    serve.add_argument("--dir", default=os.environ.get("POSTER_CACHE_DIR", DEFAULT_POSTER_DIR))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dir, exist_ok=True)
+    handler = lambda *a, **kw: _PosterHandler(*a, directory=args.dir, **kw)  # noqa: E731
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"serving {args.dir} on http://{args.host}:{args.port} (POSTER_BASE_URL로 지정)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
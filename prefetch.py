@@ -0,0 +1,97 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+
+# =========================================================
+# 추측 prefetch (사용자가 아직 답하는 중일 때)
+# - 세션마다 "지금 답 기준" 작업 하나만 유지: 답이 바뀌면 이전 작업은 취소(시작 전) 또는
+#   다음 요청 전에 멈춤(실행 중, stop 이벤트)
+# - 세션당 예산(budget)만큼만 새 작업을 시작 → 라디오를 계속 바꿔도 업스트림이 넘치지 않음
+#   (결과를 볼 때마다 reset_budget으로 다시 채움)
+# - 작업은 프로세스 공용 워커 몇 개에서 돌고, TMDB 호출은 낮은 우선순위(PRIORITY_PREFETCH)
+# =========================================================
+PREFETCH_WORKERS = 2
+DEFAULT_SESSION_BUDGET = 12
+
+
+class SpeculativePrefetcher:
+    def __init__(self, workers: int = PREFETCH_WORKERS, session_budget: int = DEFAULT_SESSION_BUDGET):
+        self.session_budget = int(session_budget)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.cancelled = 0
+        self.completed = 0
+        self.failed = 0
+        self.over_budget = 0
+
+    def speculate(self, state: dict, job_key, fn) -> bool:
+        # state: 세션별 저장소(st.session_state 등). fn(should_stop) 을 백그라운드로 실행
+        # 반환값: 새 작업을 시작했으면 True
+        current = state.get("job")
+        if current is not None and current["key"] == job_key:
+            return False
+        if current is not None:
+            self._cancel(current)
+            state["job"] = None
+        used = state.get("used", 0)
+        if used >= self.session_budget:
+            with self._lock:
+                self.over_budget += 1
+            return False
+
+        stop = threading.Event()
+
+        def run():
+            if stop.is_set():
+                return None
+            return fn(stop.is_set)
+
+        future = self._pool.submit(run)
+        future.add_done_callback(self._done)
+        state["job"] = {"key": job_key, "future": future, "stop": stop}
+        state["used"] = used + 1
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def reset_budget(self, state: dict) -> None:
+        # 결과를 보여준 뒤: 다음 답을 고르는 동안 다시 session_budget만큼 추측할 수 있게
+        state["used"] = 0
+
+    def _cancel(self, job: dict) -> None:
+        job["stop"].set()
+        if job["future"].cancel() or not job["future"].done():
+            with self._lock:
+                self.cancelled += 1
+
+    def _done(self, future: Future) -> None:
+        if future.cancelled():
+            return
+        with self._lock:
+            if future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "cancelled": self.cancelled,
+                "completed": self.completed,
+                "failed": self.failed,
+                "over_budget": self.over_budget,
+                "session_budget": self.session_budget,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher() -> SpeculativePrefetcher | None:
+    # 프로세스 공용 추측 prefetch 워커 (PREFETCH_SESSION_BUDGET=0 이면 비활성화)
+    budget = int(os.environ.get("PREFETCH_SESSION_BUDGET", str(DEFAULT_SESSION_BUDGET)))
+    if budget <= 0:
+        return None
+    return SpeculativePrefetcher(session_budget=budget)
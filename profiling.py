@@ -0,0 +1,230 @@
+import html
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+
+# =========================================================
+# 요청 시 프로파일링 (샘플링, 표준 라이브러리만 사용)
+# - 별도 스레드가 SAMPLE_INTERVAL마다 sys._current_frames()로 호출 스택을 모음
+#   · 스크립트 스레드(시작한 스레드) + 스레드 풀 작업 스레드(상세 정보/hedge/포스터 등: JSON 디코딩이 여기서 일어남)
+#   · 일감을 기다리며 쉬고 있는 풀 스레드는 세지 않음
+#   · 프로세스 공용 풀(refresh, poster 등)은 다른 세션의 일도 섞일 수 있음 → 스레드 이름별로 따로 쌓음
+# - 끝나면 PROFILE_DIR에 실행 하나당 세 파일을 씀
+#   · .folded: 접힌 스택(flamegraph.pl, speedscope 등에 그대로 입력 가능)
+#   · .svg: 브라우저로 여는 flame graph
+#   · .txt: self/total 샘플 기준 상위 TOP_N 함수
+# - 켜는 방법은 app.py 참고(APP_PROFILE 환경 변수 또는 관리자 ?profile=)
+# =========================================================
+PROFILE_DIR = os.environ.get("APP_PROFILE_DIR", os.path.join(".cache", "profiles"))
+SAMPLE_INTERVAL = float(os.environ.get("APP_PROFILE_INTERVAL", "0.005"))
+TOP_N = 30
+
+# 끝내지 못한 실행(예외, st.rerun)이 샘플링 스레드를 계속 붙잡지 않도록 하는 상한(초)
+MAX_DURATION = 120.0
+
+# 스레드 풀 작업 스레드 이름: "ThreadPoolExecutor-3_0", "hedge_1" 등
+_POOL_THREAD = re.compile(r"^(.+)_\d+$")
+
+_active: dict[int, "Profiler"] = {}
+_active_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle_worker(frame) -> bool:
+    # 풀 스레드가 다음 일감을 기다리는 중(concurrent.futures.thread._worker에서 큐 대기)
+    return frame.f_code.co_name == "_worker" and frame.f_code.co_filename.endswith(
+        os.path.join("concurrent", "futures", "thread.py")
+    )
+
+
+class Profiler:
+    def __init__(self, label: str, interval: float = SAMPLE_INTERVAL):
+        self.label = label
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _roots(self) -> dict[int, str]:
+        roots = {self._target: "script"}
+        for thread in threading.enumerate():
+            match = _POOL_THREAD.match(thread.name)
+            if match and thread.ident is not None:
+                roots[thread.ident] = re.sub(r"-\d+$", "", match.group(1))
+        return roots
+
+    def _sample(self) -> None:
+        roots = self._roots()
+        for ident, frame in sys._current_frames().items():
+            root = roots.get(ident)
+            if root is None or (root != "script" and _is_idle_worker(frame)):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(root)
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + MAX_DURATION
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            self._sample()
+
+    def start(self) -> "Profiler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def write(self, directory: str = PROFILE_DIR) -> dict:
+        # 반환값: {"folded", "svg", "report"} → 파일 경로
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(1000 * (time.time() % 1)):03d}"
+        base = os.path.join(directory, f"{stamp}-{self.label}")
+        title = f"{self.label} · {1000 * self.elapsed:.0f} ms · {self.samples} samples @ {1000 * self.interval:g} ms"
+        paths = {"folded": base + ".folded", "svg": base + ".svg", "report": base + ".txt"}
+        with open(paths["folded"], "w", encoding="utf-8") as f:
+            f.writelines(f"{stack} {n}\n" for stack, n in sorted(self.stacks.items()))
+        with open(paths["svg"], "w", encoding="utf-8") as f:
+            f.write(render_flamegraph(self.stacks, title))
+        with open(paths["report"], "w", encoding="utf-8") as f:
+            f.write(render_report(self.stacks, self.interval, title))
+        return paths
+
+
+def start(label: str, outer: bool = False) -> Profiler | None:
+    # 이 스레드에서 이미 프로파일링 중이면(전체 실행 안의 fragment 등) None → 바깥 프로파일에 포함됨
+    # outer=True(스크립트 맨 처음): 이전 실행이 중간에 끝나(st.rerun, 예외) 남은 프로파일러는 버림
+    ident = threading.get_ident()
+    with _active_lock:
+        current = _active.get(ident)
+        if current is not None and (outer or not current._thread.is_alive()):
+            current._stop.set()
+            current = None
+        if current is not None:
+            return None
+        profiler = _active[ident] = Profiler(label)
+    return profiler.start()
+
+
+def finish(profiler: Profiler | None) -> dict | None:
+    if profiler is None:
+        return None
+    profiler.stop()
+    with _active_lock:
+        _active.pop(profiler._target, None)
+    try:
+        return profiler.write()
+    except OSError:
+        return None
+
+
+# =========================================================
+# Report
+# =========================================================
+def render_report(stacks: Counter, interval: float, title: str, top_n: int = TOP_N) -> str:
+    # self: 스택 맨 위(실제로 실행 중)였던 샘플 수 / total: 스택 어딘가에 있던 샘플 수(재귀는 한 번만)
+    self_counts, total_counts = Counter(), Counter()
+    total = sum(stacks.values())
+    for stack, n in stacks.items():
+        frames = stack.split(";")[1:]
+        if not frames:
+            continue
+        self_counts[frames[-1]] += n
+        for label in set(frames):
+            total_counts[label] += n
+
+    lines = [title, "스레드별 샘플: " + ", ".join(f"{k}={v}" for k, v in _thread_totals(stacks).most_common()), ""]
+    for name, counts in (("self", self_counts), ("total", total_counts)):
+        lines.append(f"== 상위 {top_n} ({name}) ==")
+        lines.append(f"{'samples':>8} {'ms':>9} {'%':>6}  function")
+        for label, n in counts.most_common(top_n):
+            pct = 100 * n / total if total else 0.0
+            lines.append(f"{n:>8} {1000 * n * interval:>9.1f} {pct:>6.1f}  {label}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _thread_totals(stacks: Counter) -> Counter:
+    out = Counter()
+    for stack, n in stacks.items():
+        out[stack.split(";", 1)[0]] += n
+    return out
+
+
+# =========================================================
+# Flame graph (SVG)
+# =========================================================
+FRAME_HEIGHT = 16
+SVG_WIDTH = 1200
+MIN_WIDTH = 0.5
+
+
+def _color(label: str) -> str:
+    h = zlib.crc32(label.encode("utf-8"))
+    return f"rgb({205 + h % 50},{80 + (h >> 8) % 120},{(h >> 16) % 60})"
+
+
+def render_flamegraph(stacks: Counter, title: str) -> str:
+    # 접힌 스택 → 트리 → 너비가 샘플 수에 비례하는 사각형(아래가 바깥 호출)
+    tree = {"n": 0, "children": {}}
+    for stack, n in stacks.items():
+        node = tree
+        node["n"] += n
+        for label in stack.split(";"):
+            node = node["children"].setdefault(label, {"n": 0, "children": {}})
+            node["n"] += n
+
+    depth = [0]
+    rects = []
+    scale = SVG_WIDTH / tree["n"] if tree["n"] else 0.0
+
+    def layout(node: dict, x: float, level: int) -> None:
+        for label, child in sorted(node["children"].items()):
+            width = child["n"] * scale
+            if width >= MIN_WIDTH:
+                rects.append((label, child["n"], x, level, width))
+                depth[0] = max(depth[0], level + 1)
+                layout(child, x, level + 1)
+            x += width
+
+    layout(tree, 0.0, 0)
+    top = 2 * FRAME_HEIGHT
+    height = top + depth[0] * FRAME_HEIGHT + 4
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SVG_WIDTH}" height="{height}" '
+        f'font-family="monospace" font-size="11">',
+        '<rect width="100%" height="100%" fill="#fdfdf6"/>',
+        f'<text x="4" y="{FRAME_HEIGHT}" font-size="13">{html.escape(title)}</text>',
+    ]
+    total = tree["n"] or 1
+    for label, n, x, level, width in rects:
+        y = height - 4 - (level + 1) * FRAME_HEIGHT
+        tip = html.escape(f"{label} — {n} samples ({100 * n / total:.1f}%)")
+        text = html.escape(label[: int(width / 7)]) if width > 21 else ""
+        out.append(
+            f'<g><title>{tip}</title><rect x="{x:.2f}" y="{y}" width="{width:.2f}" height="{FRAME_HEIGHT - 1}" '
+            f'fill="{_color(label)}"/><text x="{x + 3:.2f}" y="{y + FRAME_HEIGHT - 4}">{text}</text></g>'
+        )
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
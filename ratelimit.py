@@ -0,0 +1,117 @@
+import heapq
+import itertools
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# =========================================================
+# 프로세스 전체 TMDB 호출 속도 제한 (token bucket + 우선순위 대기열)
+# - 초당 rate개 토큰이 채워지고, 최대 burst개까지 모아둘 수 있음
+# - 토큰이 없으면 에러 대신 대기열에서 순서를 기다림(우선순위 낮은 숫자가 먼저)
+# - 429 / Retry-After / X-RateLimit-* 헤더를 받으면 그 시간 동안 전체 호출을 멈춤
+# =========================================================
+PRIORITY_INTERACTIVE = 0  # 결과 보기 클릭 → discover 등 사용자가 기다리는 호출
+PRIORITY_ENRICHMENT = 1  # 상세 정보(movie_details) 보강
+PRIORITY_PREFETCH = 2  # 미리 가져오기 등 백그라운드 호출
+
+
+def parse_retry_after(headers) -> float | None:
+    # Retry-After: 초 단위 숫자 또는 HTTP 날짜
+    value = (headers or {}).get("Retry-After")
+    if value:
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    # TMDB(구버전) X-RateLimit-Remaining / X-RateLimit-Reset(epoch 초)
+    remaining = (headers or {}).get("X-RateLimit-Remaining")
+    reset = (headers or {}).get("X-RateLimit-Reset")
+    if remaining is not None and reset is not None:
+        try:
+            if int(remaining) <= 0:
+                return max(0.0, float(reset) - time.time())
+        except ValueError:
+            pass
+    return None
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._cond = threading.Condition()
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self.acquired = 0
+        self.waited = 0
+        self.pauses = 0
+
+    def _refill(self, now: float) -> None:
+        if now > self._last:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        entry = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            waited = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    is_head = self._waiters[0] == entry
+                    if is_head and now >= self._paused_until and self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        self.acquired += 1
+                        self.waited += int(waited)
+                        return True
+
+                    if not is_head:
+                        wait = None  # 앞사람이 토큰을 가져가면 notify로 깨어남
+                    elif now < self._paused_until:
+                        wait = self._paused_until - now
+                    else:
+                        wait = (1.0 - self._tokens) / self.rate
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    waited = True
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        # 업스트림이 429/Retry-After로 알려준 시간 동안 모든 호출을 멈춤
+        with self._cond:
+            until = time.monotonic() + max(0.0, seconds)
+            if until > self._paused_until:
+                self._paused_until = until
+                self.pauses += 1
+            # 재개 시점부터 토큰을 다시 채움(재개 직후 한꺼번에 몰리지 않도록)
+            self._tokens = 0.0
+            self._last = max(self._last, self._paused_until)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "acquired": self.acquired,
+                "waited": self.waited,
+                "pauses": self.pauses,
+                "queued": len(self._waiters),
+            }
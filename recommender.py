@@ -0,0 +1,550 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from streamlit import logger as st_logger
+
+import metrics
+from breaker import UpstreamUnavailable
+from posters import VARIANTS, get_poster_cache
+from ratelimit import PRIORITY_INTERACTIVE, PRIORITY_PREFETCH
+from scoring import GENRES, decide_genres_and_reasons
+from similar import get_similar_index
+from snapshots import snapshot_key
+from tmdb import (
+    MovieDetails,
+    build_image_url,
+    discover_movies_page,
+    enrich_movies,
+    get_configuration,
+    get_memory_caches,
+    get_snapshot,
+    image_base_url,
+    iter_movie_details,
+    movie_details,
+)
+
+# =========================================================
+# 추천 파이프라인 (UI 없음)
+# - 채점 → (스냅샷에 있으면 바로 응답) → discover → 중복 제거 → 상세 정보 보강
+# - app.py와 배치(CLI) 모드가 같은 recommend()를 사용
+# =========================================================
+
+# 연령대(추가) → 최소 평가 수/정렬에 아주 약하게 반영(추천 안정화)
+AGE_PRESET = {
+    "10대": {"min_vote_count": 50},
+    "20대": {"min_vote_count": 120},
+    "30대": {"min_vote_count": 150},
+    "40대+": {"min_vote_count": 180},
+}
+
+# 사이드바 기본값과 같은 필터 기본값 (min_vote_count는 연령대 프리셋)
+DEFAULT_FILTERS = {
+    "language": "ko-KR",
+    "sort_by": "popularity.desc",
+    "vote_avg_min": 6.0,
+    "vote_avg_max": 9.5,
+    "country_mode": "모두",
+}
+
+RESULT_COUNT = 9
+
+# "비슷한 영화"로 보여주는 이웃 수
+SIMILAR_COUNT = 6
+
+# 결과 페이지 시간 예산(초): 이 안에 못 받은 상세 정보는 discover 데이터만으로 카드 표시
+PAGE_BUDGET = float(os.environ.get("RESULTS_PAGE_BUDGET", "8"))
+
+# 후보 수집: 이만큼 모이면 멈춤 / 장르 조합 결과가 이보다 적으면 top1 단독 결과를 이어 붙임 / 최대 페이지
+CANDIDATE_TARGET = 12
+FALLBACK_MIN = 10
+MAX_CANDIDATE_PAGES = 3
+# 장르 조합 1페이지가 이 시간(초) 안에 오지 않으면 fallback을 미리 보냄(빨리 오면 모자랄 때만 보냄)
+FALLBACK_HEDGE_DELAY = 0.25
+
+
+# =========================================================
+# Utilities
+# =========================================================
+_WS_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^\w\s가-힣]")
+
+
+def normalize_title(t: str) -> str:
+    t = (t or "").strip().lower()
+    t = _WS_RE.sub(" ", t)
+    return _PUNCT_RE.sub("", t)
+
+
+def add_unique(out: list, movies: list[dict], seen_ids: set, seen_titles: set, limit: int | None = None) -> bool:
+    # id와 정규화한 제목이 모두 처음인 영화만 out에 이어 붙임. limit개가 차면 바로 멈추고 True
+    for m in movies:
+        if limit is not None and len(out) >= limit:
+            break
+        mid = m.get("id")
+        t = normalize_title(m.get("title") or "")
+        if not t or t in seen_titles or (mid and mid in seen_ids):
+            continue
+        seen_titles.add(t)
+        if mid:
+            seen_ids.add(mid)
+        out.append(m)
+    return limit is not None and len(out) >= limit
+
+
+def movie_reason(genre_names: list[str], vote_avg: float, has_trailer: bool, viewer_mood: str) -> str:
+    bits = [
+        f"당신의 취향 장르(**{', '.join(genre_names)}**) 기반으로 골랐어요.",
+        f"지금 기분(“{viewer_mood}”)에 맞는 분위기의 인기작이에요.",
+    ]
+    if vote_avg >= 7.5:
+        bits.append("평점이 높아서 만족도가 좋은 편이에요.")
+    if has_trailer:
+        bits.append("트레일러로 분위기를 먼저 확인할 수 있어요.")
+    return " ".join(bits)
+
+
+def resolve_filters(age_band: str, filters: dict | None) -> dict:
+    out = dict(DEFAULT_FILTERS)
+    out["min_vote_count"] = AGE_PRESET.get(age_band, AGE_PRESET["20대"])["min_vote_count"]
+    out.update({k: v for k, v in (filters or {}).items() if v is not None})
+    return out
+
+
+def index_movie(m: dict, d: MovieDetails | None = None) -> None:
+    # 받거나(discover/상세) 불러온(스냅샷) 영화를 "비슷한 영화" 색인에 넣음(상세 정보가 있으면 출연진까지 반영)
+    # → 카드를 그렸는지, 어느 캐시에서 왔는지와 상관없이 같은 색인
+    if not m.get("id"):
+        return
+    d = d or MovieDetails()
+    get_similar_index().add(
+        dict(
+            m,
+            title=d.title or m.get("title"),
+            vote_average=float(d.vote_average or m.get("vote_average") or 0.0),
+            poster_path=d.poster_path or m.get("poster_path"),
+        ),
+        d.cast,
+    )
+
+
+def build_movie(m: dict, d: MovieDetails, cfg: dict, chosen: list[str], viewer_mood: str) -> dict:
+    # 화면/배치 출력에 필요한 필드만 모은 결과 카드
+    title = d.title or m.get("title") or "제목 정보 없음"
+    vote_avg = float(d.vote_average or m.get("vote_average") or 0.0)
+    poster_path = d.poster_path or m.get("poster_path")
+    trailer = d.trailer_url
+    return {
+        "id": int(m["id"]),
+        "title": title,
+        "overview": d.overview or m.get("overview") or "줄거리 정보가 없어요.",
+        "vote_average": vote_avg,
+        "poster_path": poster_path,
+        "poster_url": build_image_url(cfg, poster_path, "w500"),
+        "thumb_url": build_image_url(cfg, poster_path, VARIANTS["grid"]["tmdb_size"]),
+        "trailer_url": trailer,
+        "cast": list(d.cast),
+        "reason": movie_reason(chosen, vote_avg, bool(trailer), viewer_mood),
+    }
+
+
+def _indexed(movies: list[dict]) -> list[dict]:
+    for m in movies:
+        index_movie(m)
+    return movies
+
+
+def pick_candidates(
+    top1: str,
+    top2: str | None,
+    f: dict,
+    api_key: str | None,
+    v4_token: str | None,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: float | None = None,
+) -> list[dict]:
+    # top1+top2 discover를 먼저 보내고, top1 단독 fallback은 필요할 때만 보낸 뒤 정해진 순서로 합치며 dedup
+    # - fallback은 1페이지가 FALLBACK_MIN 미만이거나, FALLBACK_HEDGE_DELAY 안에 오지 않을 때(미리) 보냄
+    # - 합치는 순서: 장르 조합 1페이지 → (1페이지가 FALLBACK_MIN 미만이면) fallback → 장르 조합 다음 페이지
+    # - CANDIDATE_TARGET개가 차면 바로 멈추고 남은 요청은 취소
+    chosen = [top1] + ([top2] if top2 else [])
+    with_genres = ",".join(str(GENRES[g]) for g in chosen)
+
+    def discover(genres: str, page: int, min_vote_count: int) -> tuple[list[dict], bool]:
+        movies, has_more = discover_movies_page(
+            api_key=api_key,
+            v4_token=v4_token,
+            with_genres=genres,
+            language=f["language"],
+            sort_by=f["sort_by"],
+            page=page,
+            min_vote_count=min_vote_count,
+            vote_avg_min=f["vote_avg_min"],
+            vote_avg_max=f["vote_avg_max"],
+            country_mode=f["country_mode"],
+            priority=priority,
+            deadline=deadline,
+        )
+        return _indexed(movies), has_more
+
+    out, seen_ids, seen_titles = [], set(), set()
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="candidates")
+    try:
+        first = pool.submit(discover, with_genres, 1, f["min_vote_count"])
+        fallback = None
+
+        def start_fallback():
+            return pool.submit(discover, str(GENRES[top1]), 1, max(0, f["min_vote_count"] // 2))
+
+        with metrics.span("recommend_stage_seconds", stage="discover"):
+            if top2 and not wait([first], timeout=FALLBACK_HEDGE_DELAY).done:
+                fallback = start_fallback()
+            results, has_more = first.result()
+        with metrics.span("recommend_stage_seconds", stage="dedup"):
+            done = add_unique(out, results, seen_ids, seen_titles, CANDIDATE_TARGET)
+        if top2:
+            if len(results) < FALLBACK_MIN and not done:
+                fallback = fallback or start_fallback()
+                with metrics.span("recommend_stage_seconds", stage="fallback_discover"):
+                    fallback_results, _ = fallback.result()
+                with metrics.span("recommend_stage_seconds", stage="dedup"):
+                    done = add_unique(out, fallback_results, seen_ids, seen_titles, CANDIDATE_TARGET)
+            elif fallback is not None:
+                fallback.cancel()
+
+        # 모자라면(업스트림에 다음 페이지가 있을 때만) 다음 페이지
+        # - 넓힌 페이지를 정확한 조건으로 거른 결과는 PAGE_SIZE보다 짧을 수 있으므로 결과 길이가 아닌 has_more로 판단
+        page = 1
+        while not done and has_more and page < MAX_CANDIDATE_PAGES:
+            page += 1
+            with metrics.span("recommend_stage_seconds", stage="discover_more"):
+                results, has_more = discover(with_genres, page, f["min_vote_count"])
+            with metrics.span("recommend_stage_seconds", stage="dedup"):
+                done = add_unique(out, results, seen_ids, seen_titles, CANDIDATE_TARGET)
+    finally:
+        # 이미 시작된 요청은 끝나는 대로 캐시만 채우고, 기다리지 않음
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return out[:RESULT_COUNT]
+
+
+# 스냅샷에 저장하는 discover 필드 (build_movie와 "비슷한 영화" 색인이 쓰는 것만)
+SNAPSHOT_MOVIE_FIELDS = ("id", "title", "overview", "vote_average", "poster_path", "genre_ids", "original_language")
+
+
+def snapshot_record(m: dict, d: MovieDetails) -> dict:
+    return {"movie": {k: m.get(k) for k in SNAPSHOT_MOVIE_FIELDS}, "details": d.to_dict()}
+
+
+def snapshot_movies(top1: str, top2: str | None, f: dict) -> list[tuple[dict, MovieDetails]] | None:
+    # 미리 계산한 스냅샷에 이 조합이 있으면 (후보, 상세) 목록, 없으면 None → 라이브 경로
+    snapshot = get_snapshot()
+    rows = snapshot.lookup(snapshot_key(top1, top2, f)) if snapshot is not None else None
+    if rows is None:
+        return None
+    movies = [(r["movie"], MovieDetails.from_dict(r["details"])) for r in rows]
+    for m, d in movies:
+        index_movie(m, d)
+    return movies
+
+
+def recommend_progressive(
+    answers: dict,
+    viewer_mood: str,
+    age_band: str,
+    filters: dict | None = None,
+    api_key: str | None = None,
+    v4_token: str | None = None,
+    prefetch_posters: bool = True,
+    budget: float | None = None,
+):
+    # discover까지 끝낸 결과(카드는 discover 데이터만으로 구성)와,
+    # 상세 정보가 도착하는 대로 (인덱스, 완성된 카드)를 내보내는 iterator를 함께 반환
+    # - budget(초): 페이지 시간 예산. 모든 TMDB 호출의 timeout/재시도가 이 안에서 끝남
+    # - TMDB 장애(5xx/timeout/breaker open)면 같은 조건의 마지막 정상 결과를 source="cached"로 반환
+    # 실패 시 RuntimeError (TMDB 인증/요청 오류, 장애인데 마지막 결과도 없는 경우 등)
+    deadline = time.monotonic() + budget if budget else None
+    f = resolve_filters(age_band, filters)
+    with metrics.span("recommend_stage_seconds", stage="configuration"):
+        cfg = get_configuration(api_key, v4_token)
+
+    with metrics.span("recommend_stage_seconds", stage="scoring"):
+        scores, top1, top2, reasons1, reasons2 = decide_genres_and_reasons(
+            answers=answers,
+            viewer_mood=viewer_mood,
+            age_band=age_band,
+        )
+    chosen = [top1] + ([top2] if top2 else [])
+    result = {
+        "top1": top1,
+        "top2": top2,
+        "chosen": chosen,
+        "scores": scores,
+        "reasons1": reasons1,
+        "reasons2": reasons2,
+        "filters": f,
+    }
+    last_good = get_memory_caches().cache("last_good")
+    last_good_key = (snapshot_key(top1, top2, f), viewer_mood)
+
+    with metrics.span("recommend_stage_seconds", stage="snapshot"):
+        cached = snapshot_movies(top1, top2, f)
+    if cached is not None:
+        top_list = [m for m, _ in cached]
+    else:
+        try:
+            with metrics.span("recommend_stage_seconds", stage="candidates"):
+                candidates = pick_candidates(top1, top2, f, api_key, v4_token, deadline=deadline)
+                top_list = [m for m in candidates if m.get("id")]
+        except UpstreamUnavailable:
+            hit, good = last_good.get(last_good_key)
+            if not hit:
+                raise
+            result.update(source="cached", cached_at=good["at"], movies=list(good["movies"]))
+            return result, iter(())
+
+    # 상세 정보를 받는 동안 포스터 썸네일을 미리 받아둠
+    poster_cache = get_poster_cache() if prefetch_posters else None
+    if poster_cache:
+        poster_cache.prefetch(image_base_url(cfg), [m.get("poster_path") for m in top_list])
+
+    # "snapshot": 미리 계산한 스냅샷에서 바로 응답(상세 정보까지 완성) / "live": TMDB 경로
+    # "cached": TMDB 장애로 마지막 정상 결과를 대신 보여줌(cached_at: 그 결과를 만든 시각)
+    result["source"] = "snapshot" if cached is not None else "live"
+    if cached is not None:
+        result["movies"] = [build_movie(m, d, cfg, chosen, viewer_mood) for m, d in cached]
+    else:
+        result["movies"] = [build_movie(m, MovieDetails(), cfg, chosen, viewer_mood) for m in top_list]
+
+    def fill():
+        # 스냅샷에서 온 카드는 이미 완성됨
+        if cached is not None:
+            return
+        # details: 첫 상세 요청부터 마지막 상세 도착까지(호출 측이 카드를 다시 그리는 시간 포함)
+        complete = True
+        with metrics.span("recommend_stage_seconds", stage="details"):
+            for i, d in iter_movie_details(api_key, v4_token, top_list, f["language"], deadline):
+                complete = complete and d.title is not None
+                index_movie(top_list[i], d)
+                result["movies"][i] = build_movie(top_list[i], d, cfg, chosen, viewer_mood)
+                yield i, result["movies"][i]
+        # 상세 정보까지 모두 받은 결과만 장애 시 대체용으로 보관
+        if complete:
+            last_good.set(last_good_key, {"movies": list(result["movies"]), "at": time.time()})
+
+    return result, fill()
+
+
+def recommend(
+    answers: dict,
+    viewer_mood: str,
+    age_band: str,
+    filters: dict | None = None,
+    api_key: str | None = None,
+    v4_token: str | None = None,
+    prefetch_posters: bool = True,
+) -> dict:
+    # 상세 정보까지 모두 채운 결과
+    result, pending = recommend_progressive(answers, viewer_mood, age_band, filters, api_key, v4_token, prefetch_posters)
+    for _ in pending:
+        pass
+    return result
+
+
+# =========================================================
+# More results (discover 2페이지 이후)
+# =========================================================
+def _page_candidates(
+    result: dict, page: int, api_key: str | None, v4_token: str | None, priority: int, deadline: float | None = None
+) -> tuple[list[dict], bool]:
+    # (아직 보여주지 않은 후보, 다음 페이지가 있을 수 있는지)
+    f = result["filters"]
+    candidates, has_more = discover_movies_page(
+        api_key=api_key,
+        v4_token=v4_token,
+        with_genres=",".join(str(GENRES[g]) for g in result["chosen"]),
+        language=f["language"],
+        sort_by=f["sort_by"],
+        page=page,
+        min_vote_count=f["min_vote_count"],
+        vote_avg_min=f["vote_avg_min"],
+        vote_avg_max=f["vote_avg_max"],
+        country_mode=f["country_mode"],
+        priority=priority,
+        deadline=deadline,
+    )
+    _indexed(candidates)
+    # 이미 보여준 카드와 겹치지 않게(id, 제목 기준)
+    seen_ids = {m["id"] for m in result["movies"]}
+    seen_titles = {normalize_title(m["title"]) for m in result["movies"]}
+    out = []
+    add_unique(out, [m for m in candidates if m.get("id")], seen_ids, seen_titles)
+    return out, has_more
+
+
+def more_movies(
+    result: dict,
+    page: int,
+    viewer_mood: str,
+    api_key: str | None,
+    v4_token: str | None,
+    budget: float | None = None,
+) -> tuple[list[dict], int, bool]:
+    # discover page(2, 3, ...)에서 새 카드들을 만들어 (카드, 마지막으로 읽은 페이지, 다음 페이지가 있는지) 반환
+    # - 거른 뒤 새 카드가 없는 페이지는 건너뜀(한 번에 MAX_CANDIDATE_PAGES까지)
+    # - result["movies"]는 호출 측에서 이어 붙임
+    deadline = time.monotonic() + budget if budget else None
+    cfg = get_configuration(api_key, v4_token)
+    top_list, has_more = _page_candidates(result, page, api_key, v4_token, PRIORITY_INTERACTIVE, deadline)
+    last_page = page
+    while not top_list and has_more and last_page - page + 1 < MAX_CANDIDATE_PAGES:
+        last_page += 1
+        top_list, has_more = _page_candidates(result, last_page, api_key, v4_token, PRIORITY_INTERACTIVE, deadline)
+    enriched = enrich_movies(api_key, v4_token, top_list, result["filters"]["language"], deadline)
+    for m, d in enriched:
+        index_movie(m, d)
+    return [build_movie(m, d, cfg, result["chosen"], viewer_mood) for m, d in enriched], last_page, has_more
+
+
+def similar_movies(movie_id: int, k: int = SIMILAR_COUNT) -> list[dict]:
+    # 지금까지 받은 영화 중 movie_id와 비슷한 영화 (로컬 색인만 사용)
+    return [
+        {
+            "id": n["id"],
+            "title": n["title"] or "제목 정보 없음",
+            "vote_average": float(n["vote_average"] or 0.0),
+            "score": n["score"],
+        }
+        for n in get_similar_index().similar(movie_id, k)
+    ]
+
+
+def warm_page(result: dict, page: int, api_key: str | None, v4_token: str | None, should_stop=lambda: False) -> int:
+    # "더 보기"를 누르기 전에 다음 페이지를 낮은 우선순위로 캐시에 채워둠
+    top_list, _ = _page_candidates(result, page, api_key, v4_token, PRIORITY_PREFETCH)
+    warmed = 0
+    for m in top_list:
+        if should_stop():
+            break
+        language = result["filters"]["language"]
+        index_movie(m, movie_details(api_key, v4_token, int(m["id"]), language, _priority=PRIORITY_PREFETCH))
+        warmed += 1
+    return warmed
+
+
+# =========================================================
+# Speculative warm-up
+# - 사용자가 답하는 동안 지금 답 기준으로 결과에 필요한 TMDB 응답을 낮은 우선순위로 캐시에 채워둠
+# - should_stop()이 True가 되면(답이 바뀌어 쓸모없어지면) 다음 요청 전에 멈춤
+# =========================================================
+# 미리 받아둘 상세 정보 수(결과 화면 상단부터)
+WARM_DETAILS = 3
+
+
+def warm_recommendation(
+    answers: dict,
+    viewer_mood: str,
+    age_band: str,
+    filters: dict | None,
+    api_key: str | None,
+    v4_token: str | None,
+    should_stop=lambda: False,
+) -> int:
+    # 반환값: 상세 정보를 미리 받은 영화 수
+    f = resolve_filters(age_band, filters)
+    get_configuration(api_key, v4_token)
+    _, top1, top2, _, _ = decide_genres_and_reasons(answers=answers, viewer_mood=viewer_mood, age_band=age_band)
+    if should_stop() or snapshot_movies(top1, top2, f) is not None:
+        return 0
+    top_list = pick_candidates(top1, top2, f, api_key, v4_token, priority=PRIORITY_PREFETCH)
+    warmed = 0
+    for m in top_list[:WARM_DETAILS]:
+        if should_stop():
+            break
+        index_movie(m, movie_details(api_key, v4_token, int(m["id"]), f["language"], _priority=PRIORITY_PREFETCH))
+        warmed += 1
+    return warmed
+
+
+# =========================================================
+# Batch mode (CLI)
+# - 입력: JSONL, 한 줄에 {"id", "answers": {"q1".."q5"}, "viewer_mood", "age_band", "filters"}
+#   (answers 대신 q1..q5를 최상위에 둬도 됨)
+# - 출력: JSONL, 입력 순서대로 {"id", "result"} 또는 {"id", "error"}
+# - 워커 스레드들이 같은 프로세스의 TMDB 캐시/속도 제한기/single-flight를 공유
+# =========================================================
+def run_record(record: dict, api_key: str | None, v4_token: str | None) -> dict:
+    answers = record.get("answers") or {k: record[k] for k in ("q1", "q2", "q3", "q4", "q5") if k in record}
+    out = {"id": record.get("id", record.get("request_id"))}
+    try:
+        out["result"] = recommend(
+            answers=answers,
+            viewer_mood=record.get("viewer_mood", ""),
+            age_band=record.get("age_band", "20대"),
+            filters=record.get("filters"),
+            api_key=api_key,
+            v4_token=v4_token,
+            prefetch_posters=False,
+        )
+    except Exception as e:
+        out["error"] = str(e)
+    return out
+
+
+def run_batch(records, api_key: str | None, v4_token: str | None, workers: int):
+    # 입력 순서를 지키면서, 한 번에 workers * 4개까지만 메모리에 올려 처리
+    chunk = max(1, workers * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        buf = []
+        for record in records:
+            buf.append(record)
+            if len(buf) >= chunk:
+                yield from pool.map(lambda r: run_record(r, api_key, v4_token), buf)
+                buf = []
+        if buf:
+            yield from pool.map(lambda r: run_record(r, api_key, v4_token), buf)
+
+
+def _read_jsonl(fp):
+    for line in fp:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="JSONL 답변 파일로 영화 추천을 일괄 생성합니다.")
+    parser.add_argument("input", help="입력 JSONL 경로 ('-'이면 stdin)")
+    parser.add_argument("-o", "--output", default="-", help="출력 JSONL 경로 (기본: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+    # Streamlit 런타임 없이 캐시를 쓸 때 나오는 경고는 배치에서는 무시
+    st_logger.set_log_level("error")
+
+    api_key = os.environ.get("TMDB_API_KEY")
+    v4_token = os.environ.get("TMDB_V4_TOKEN")
+    if not api_key and not v4_token:
+        print("TMDB_API_KEY 또는 TMDB_V4_TOKEN 환경 변수를 설정해 주세요.", file=sys.stderr)
+        return 2
+
+    fin = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    failed = 0
+    try:
+        for out in run_batch(_read_jsonl(fin), api_key, v4_token, args.workers):
+            failed += "error" in out
+            fout.write(json.dumps(out, ensure_ascii=False) + "\n")
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+import itertools
+
+import numpy as np
+
+# =========================================================
+# Genres / Moods
+# =========================================================
+GENRES = {
+    "액션": 28,
+    "코미디": 35,
+    "드라마": 18,
+    "SF": 878,
+    "로맨스": 10749,
+    "판타지": 14,
+}
+TIE_BREAK = ["드라마", "로맨스", "액션", "SF", "판타지", "코미디"]
+
+# 관람자 기분 상태(추가) → 장르 가중치에 반영
+VIEWER_MOOD = {
+    "힐링되는 영화가 보고 싶어": ["드라마", "로맨스"],
+    "빵빵 웃고 싶어": ["코미디"],
+    "손에 땀 쥐는 긴장감!": ["액션", "SF"],
+    "상상력/세계관에 빠지고 싶어": ["SF", "판타지"],
+    "설레고 감정선 진한 영화": ["로맨스", "드라마"],
+}
+
+# =========================================================
+# Questions (규칙 테이블)
+# - 모든 질문을 "영화 속 주인공 상황 가정형"으로 변경
+# - 3번 질문은 사용자가 지정한 여행 역할 질문으로 교체
+# - 선택지마다 (장르, 점수, 추천 이유) 목록
+# =========================================================
+QUESTIONS = [
+    {
+        "key": "q1",
+        "label": "1) 어느 날, 정체불명의 초대장이 도착했다. 당신의 첫 행동은?",
+        "options": {
+            "수상하지만 일단 따라가 본다": [
+                ("액션", 2, "사건의 중심으로 직접 뛰어드는 전개를 선택했어요."),
+            ],
+            "단서를 모으며 조심히 접근한다": [
+                ("SF", 2, "설정과 단서를 따라가는 몰입형 전개가 잘 맞아요."),
+                ("드라마", 1, "인물의 내적 판단/긴장도 함께 즐길 수 있어요."),
+            ],
+            "누군가와 함께 움직이며 관계를 확인한다": [
+                ("로맨스", 2, "관계 중심의 설렘/감정선이 중요한 편이에요."),
+                ("드라마", 1, "인물 간 감정 변화에 몰입하는 타입이에요."),
+            ],
+            "농담 한마디로 분위기부터 푼다": [
+                ("코미디", 2, "웃음과 텐션이 있는 장면을 좋아해요."),
+            ],
+        },
+    },
+    {
+        "key": "q2",
+        "label": "2) 친구가 갑자기 이별을 당했다. 당신은 어떻게 할까?",
+        "options": {
+            "조용히 옆에 있어준다": [
+                ("드라마", 2, "잔잔하지만 깊은 감정선을 선호해요."),
+                ("로맨스", 1, "관계의 온도/서사를 중요하게 여겨요."),
+            ],
+            "맛있는 걸 사주며 웃기려 한다": [
+                ("코미디", 2, "기분 전환 포인트가 중요한 편이에요."),
+                ("로맨스", 1, "따뜻한 관계 중심 이야기에도 끌려요."),
+            ],
+            "바로 밖으로 끌고 나가 땀 빼게 한다": [
+                ("액션", 2, "에너지 넘치는 전개를 선호할 가능성이 커요."),
+            ],
+            "현실적인 조언 + 해결책을 같이 찾는다": [
+                ("SF", 1, "문제 해결/전개 구조가 명확한 이야기를 좋아할 수 있어요."),
+                ("드라마", 2, "현실 공감/해결 서사에 끌려요."),
+            ],
+        },
+    },
+    {
+        "key": "q3",
+        "label": "3) 종강 후 떠나는 여행! 친구와 여행을 떠날 때 당신의 역할은?",
+        "options": {
+            "계획형": [
+                ("드라마", 2, "흐름이 탄탄한 서사에 안정감을 느껴요."),
+                ("SF", 1, "논리적 전개/설정도 즐길 수 있어요."),
+            ],
+            "즉흥적이지만 계획에 수긍": [
+                ("로맨스", 2, "우연/설렘/케미가 있는 전개에 강해요."),
+                ("코미디", 1, "즉흥에서 생기는 웃긴 상황도 좋아해요."),
+            ],
+            "액티비티는 무조건!": [
+                ("액션", 2, "박진감 넘치는 액티비티/사건 전개가 찰떡이에요."),
+                ("판타지", 1, "스케일 큰 모험도 좋아할 수 있어요."),
+            ],
+            "여행은 힐링이지": [
+                ("로맨스", 2, "따뜻하고 편안한 분위기의 영화가 잘 맞아요."),
+                ("드라마", 1, "잔잔한 여운도 좋아할 수 있어요."),
+            ],
+        },
+    },
+    {
+        "key": "q4",
+        "label": "4) 눈앞에 새로운 세계로 향하는 포탈이 열렸다. 당신의 선택은?",
+        "options": {
+            "망설임 없이 들어간다": [
+                ("액션", 2, "모험/돌파형 전개에 끌려요."),
+                ("판타지", 1, "이세계/마법 같은 설정에 매력을 느껴요."),
+            ],
+            "규칙을 파악하고 안전장치부터": [
+                ("SF", 2, "규칙/설정 기반 세계관에 몰입하는 편이에요."),
+                ("드라마", 1, "신중한 캐릭터 중심 서사도 좋아할 수 있어요."),
+            ],
+            "같이 들어갈 동료부터 찾는다": [
+                ("로맨스", 2, "관계 중심의 케미와 팀워크를 좋아해요."),
+                ("드라마", 1, "감정선이 있는 전개와도 잘 맞아요."),
+            ],
+            "일단 상황을 웃기게 정리한다": [
+                ("코미디", 2, "유머로 풀어가는 전개가 취향이에요."),
+            ],
+        },
+    },
+    {
+        "key": "q5",
+        "label": "5) 결말을 바꿀 수 있다면 어떤 결말을 선택할까?",
+        "options": {
+            "모두가 행복한 결말": [
+                ("로맨스", 2, "따뜻한 감정의 완결감을 좋아해요."),
+                ("드라마", 1, "여운 있는 해피엔딩에 끌려요."),
+            ],
+            "짜릿한 반전 결말": [
+                ("SF", 2, "설정/반전/아이디어의 쾌감을 좋아해요."),
+                ("판타지", 1, "예상 밖의 전개도 즐길 수 있어요."),
+            ],
+            "악당을 통쾌하게 제압": [
+                ("액션", 2, "카타르시스 있는 결말이 찰떡이에요."),
+            ],
+            "웃기게 마무리(쿠키영상까지!)": [
+                ("코미디", 2, "끝까지 즐겁게 웃는 영화가 좋아요."),
+            ],
+        },
+    },
+]
+
+DEFAULT_REASON = "당신의 선택이 이 장르 분위기와 잘 맞아요."
+
+# =========================================================
+# Compile: 규칙 테이블 → 가중치 행렬
+# - WEIGHTS[q, option, genre], MOOD_WEIGHTS[mood, genre]
+# =========================================================
+GENRE_ORDER = list(GENRES.keys())
+MOOD_ORDER = list(VIEWER_MOOD.keys())
+_GENRE_IDX = {g: i for i, g in enumerate(GENRE_ORDER)}
+_OPTION_IDX = [{opt: i for i, opt in enumerate(q["options"])} for q in QUESTIONS]
+_MOOD_IDX = {m: i for i, m in enumerate(MOOD_ORDER)}
+_N_OPTIONS = max(len(q["options"]) for q in QUESTIONS)
+
+
+def _compile():
+    weights = np.zeros((len(QUESTIONS), _N_OPTIONS, len(GENRE_ORDER)), dtype=np.int16)
+    reasons = [[[] for _ in range(_N_OPTIONS)] for _ in QUESTIONS]  # [q][option] → [(genre_idx, reason)]
+    for qi, q in enumerate(QUESTIONS):
+        for oi, rules in enumerate(q["options"].values()):
+            for genre, pts, reason in rules:
+                weights[qi, oi, _GENRE_IDX[genre]] += pts
+                reasons[qi][oi].append((_GENRE_IDX[genre], reason))
+
+    mood_weights = np.zeros((len(MOOD_ORDER), len(GENRE_ORDER)), dtype=np.int16)
+    for mi, mood in enumerate(MOOD_ORDER):
+        for genre in VIEWER_MOOD[mood]:
+            if genre in _GENRE_IDX:
+                mood_weights[mi, _GENRE_IDX[genre]] += 1
+    return weights, reasons, mood_weights
+
+
+WEIGHTS, _REASONS, MOOD_WEIGHTS = _compile()
+
+_TIE_RANK = {g: i for i, g in enumerate(TIE_BREAK)}
+
+
+def _pick_top(scores: list[int]) -> tuple[int, int | None]:
+    # 최고점 장르(top1)와, 점수 차이가 1 이하인 보조 장르(top2). 동점은 TIE_BREAK 순서
+    ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    top_score = scores[ranked[0]]
+    top_candidates = [i for i in ranked if scores[i] == top_score]
+    top1 = min(top_candidates, key=lambda i: _TIE_RANK.get(GENRE_ORDER[i], len(TIE_BREAK)))
+
+    top2 = None
+    if len(ranked) > 1:
+        second_score = scores[ranked[1]]
+        if (top_score - second_score) <= 1 and second_score > 0:
+            second_candidates = [i for i in ranked if scores[i] == second_score and i != top1]
+            if second_candidates:
+                top2 = min(second_candidates, key=lambda i: _TIE_RANK.get(GENRE_ORDER[i], len(TIE_BREAK)))
+    return top1, top2
+
+
+def _uniq_take(lst, k: int) -> tuple[str, ...]:
+    out = []
+    for x in lst:
+        if x and x not in out:
+            out.append(x)
+    return tuple(out[:k]) if out else (DEFAULT_REASON,)
+
+
+def _evaluate(option_idx: tuple, mood_idx: int | None, viewer_mood: str) -> tuple:
+    # option_idx: 질문별 선택지 index (테이블에 없는 답이면 None → 점수 없음)
+    scores = np.zeros(len(GENRE_ORDER), dtype=np.int16)
+    reasons_pool = [[] for _ in GENRE_ORDER]
+    for qi, oi in enumerate(option_idx):
+        if oi is None:
+            continue
+        scores += WEIGHTS[qi, oi]
+        for gi, reason in _REASONS[qi][oi]:
+            reasons_pool[gi].append(reason)
+    if mood_idx is not None:
+        scores += MOOD_WEIGHTS[mood_idx]
+        for gi in np.flatnonzero(MOOD_WEIGHTS[mood_idx]):
+            reasons_pool[gi].append(f"지금 기분(“{viewer_mood}”)에 {GENRE_ORDER[gi]} 장르가 잘 어울려요.")
+
+    scores = scores.tolist()
+    top1, top2 = _pick_top(scores)
+    return (
+        tuple(scores),
+        top1,
+        top2,
+        _uniq_take(reasons_pool[top1], 3),
+        _uniq_take(reasons_pool[top2], 2) if top2 is not None else (),
+    )
+
+
+# =========================================================
+# Precompute: 모든 답 조합 × 기분 → 결과 (import 시 1회)
+# =========================================================
+_RESULTS = {
+    (combo, mi): _evaluate(combo, mi, mood)
+    for combo in itertools.product(*(range(len(q["options"])) for q in QUESTIONS))
+    for mi, mood in enumerate(MOOD_ORDER)
+}
+
+
+def _encode(answers: dict) -> tuple:
+    return tuple(_OPTION_IDX[qi].get(answers.get(q["key"])) for qi, q in enumerate(QUESTIONS))
+
+
+def _lookup(answers: dict, viewer_mood: str) -> tuple:
+    option_idx = _encode(answers)
+    mood_idx = _MOOD_IDX.get(viewer_mood)
+    result = _RESULTS.get((option_idx, mood_idx))
+    if result is None:
+        # 테이블 밖의 답(일부 미응답 등)은 그때그때 계산
+        result = _evaluate(option_idx, mood_idx, viewer_mood)
+    return result
+
+
+def decide_genres_and_reasons(answers: dict, viewer_mood: str, age_band: str):
+    # 연령대는 추천 안정화를 위해 아주 약하게만 반영(점수에는 영향 X)
+    # (min_vote_count 등 필터에서 반영)
+    scores, top1, top2, reasons1, reasons2 = _lookup(answers, viewer_mood)
+    return (
+        dict(zip(GENRE_ORDER, scores)),
+        GENRE_ORDER[top1],
+        GENRE_ORDER[top2] if top2 is not None else None,
+        list(reasons1),
+        list(reasons2),
+    )
+
+
+# 일괄 채점용 평탄화 테이블: code = Σ option_idx[q] * stride[q] + mood_idx * stride[mood]
+_STRIDES = np.array([_N_OPTIONS**qi for qi in range(len(QUESTIONS))], dtype=np.int64)
+_MOOD_STRIDE = _N_OPTIONS ** len(QUESTIONS)
+
+
+def _flatten_results():
+    top1 = np.full(_MOOD_STRIDE * len(MOOD_ORDER), -1, dtype=np.int8)
+    top2 = np.full(_MOOD_STRIDE * len(MOOD_ORDER), -1, dtype=np.int8)
+    for (combo, mi), (_, t1, t2, _, _) in _RESULTS.items():
+        code = int(np.dot(combo, _STRIDES)) + mi * _MOOD_STRIDE
+        top1[code] = t1
+        top2[code] = -1 if t2 is None else t2
+    return top1, top2
+
+
+_TOP1, _TOP2 = _flatten_results()
+
+
+def score_batch(answer_sets: list[dict], viewer_moods: list[str]) -> tuple[np.ndarray, list[str], list[str | None]]:
+    # 분석/오프라인 평가용 일괄 채점
+    # → (점수 행렬 [N, len(GENRE_ORDER)], top1 목록, top2 목록)
+    n = len(answer_sets)
+    option_idx = np.array([[-1 if oi is None else oi for oi in _encode(a)] for a in answer_sets], dtype=np.int64)
+    option_idx = option_idx.reshape(n, len(QUESTIONS))
+    mood_idx = np.array([_MOOD_IDX.get(m, -1) for m in viewer_moods], dtype=np.int64)
+    known = (option_idx >= 0).all(axis=1) & (mood_idx >= 0)
+
+    # 가중치 행렬에서 한 번에 모아 더함
+    scores = np.zeros((n, len(GENRE_ORDER)), dtype=np.int16)
+    rows = np.flatnonzero(known)
+    q_range = np.arange(len(QUESTIONS))
+    scores[rows] = WEIGHTS[q_range, option_idx[rows]].sum(axis=1) + MOOD_WEIGHTS[mood_idx[rows]]
+    codes = option_idx[rows] @ _STRIDES + mood_idx[rows] * _MOOD_STRIDE
+    top1_idx = np.full(n, -1, dtype=np.int64)
+    top2_idx = np.full(n, -1, dtype=np.int64)
+    top1_idx[rows] = _TOP1[codes]
+    top2_idx[rows] = _TOP2[codes]
+
+    # 테이블 밖의 답이 섞인 행만 개별 계산
+    for i in np.flatnonzero(~known):
+        s, t1, t2, _, _ = _lookup(answer_sets[i], viewer_moods[i])
+        scores[i] = s
+        top1_idx[i] = t1
+        top2_idx[i] = -1 if t2 is None else t2
+
+    top1 = [GENRE_ORDER[i] for i in top1_idx]
+    top2 = [GENRE_ORDER[i] if i >= 0 else None for i in top2_idx]
+    return scores, top1, top2
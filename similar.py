@@ -0,0 +1,212 @@
+import atexit
+import json
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+import streamlit as st
+
+import metrics
+from catalog import TMDB_MOVIE_GENRE_IDS
+
+# =========================================================
+# "비슷한 영화" 로컬 유사도 검색
+# - 이미 받은 영화(discover 항목 + 상세 정보의 주요 출연진)를 작은 특징 벡터로 만들어 메모리 행렬에 보관
+#   · 장르 one-hot / 출연진·원어는 해싱 / 평점 한 칸 → 그룹마다 가중치를 준 뒤 행 전체를 L2 정규화
+# - similar(): 행렬 × 기준 영화 벡터(코사인) → 상위 k. 네트워크 호출 없음
+# - 새 영화가 들어오면 행을 추가(출연진이 생기면 갱신), 바뀐 게 있으면 SAVE_INTERVAL마다
+#   파일로 저장(임시 파일 → 교체) → 다음 프로세스가 이어서 사용
+# =========================================================
+DEFAULT_INDEX_PATH = os.path.join(".cache", "similar.npz")
+
+# 특징 배치가 바뀌면 올림(저장된 파일과 다르면 빈 색인으로 시작)
+FEATURE_VERSION = 1
+CAST_DIM = 128
+LANG_DIM = 16
+WEIGHTS = {"genre": 1.0, "cast": 0.8, "language": 0.4, "rating": 0.2}
+
+GENRE_COL = {gid: i for i, gid in enumerate(TMDB_MOVIE_GENRE_IDS)}
+CAST_OFFSET = len(GENRE_COL)
+LANG_OFFSET = CAST_OFFSET + CAST_DIM
+RATING_COL = LANG_OFFSET + LANG_DIM
+DIM = RATING_COL + 1
+
+# 색인에 넣는 최대 영화 수(행당 DIM * 4바이트 ≈ 0.6KB) / 저장 간격(초)
+MAX_MOVIES = 50000
+SAVE_INTERVAL = 60.0
+
+# 이웃 카드를 그릴 때 필요한 필드
+RECORD_FIELDS = ("title", "poster_path", "vote_average")
+
+
+def _bucket(text: str, size: int) -> int:
+    return zlib.crc32(text.encode("utf-8")) % size
+
+
+def feature_vector(movie: dict, cast=()) -> np.ndarray:
+    v = np.zeros(DIM, dtype=np.float32)
+    genres = [GENRE_COL[g] for g in movie.get("genre_ids") or [] if g in GENRE_COL]
+    if genres:
+        v[genres] = WEIGHTS["genre"] / np.sqrt(len(genres))
+    for name in cast:
+        v[CAST_OFFSET + _bucket(name, CAST_DIM)] += WEIGHTS["cast"] / np.sqrt(len(cast))
+    if movie.get("original_language"):
+        v[LANG_OFFSET + _bucket(movie["original_language"], LANG_DIM)] = WEIGHTS["language"]
+    v[RATING_COL] = WEIGHTS["rating"] * float(movie.get("vote_average") or 0.0) / 10
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+
+class SimilarityIndex:
+    def __init__(self, capacity: int = 1024, max_movies: int = MAX_MOVIES):
+        self.max_movies = int(max_movies)
+        self._lock = threading.Lock()
+        self.matrix = np.zeros((capacity, DIM), dtype=np.float32)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.has_cast = np.zeros(capacity, dtype=bool)
+        self.records: list[dict] = []
+        self.rows: dict[int, int] = {}
+        self.dirty = False
+        self.rejected = 0
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _grow(self) -> None:
+        capacity = min(2 * len(self.ids), self.max_movies)
+        self.matrix = np.concatenate([self.matrix, np.zeros((capacity - len(self.ids), DIM), dtype=np.float32)])
+        self.ids = np.concatenate([self.ids, np.zeros(capacity - len(self.ids), dtype=np.int64)])
+        self.has_cast = np.concatenate([self.has_cast, np.zeros(capacity - len(self.has_cast), dtype=bool)])
+
+    def add(self, movie: dict, cast=()) -> None:
+        # 이미 있는 영화는 출연진이 새로 생겼을 때만 갱신(discover 데이터만으로 덮어쓰지 않음)
+        movie_id = movie.get("id")
+        if not movie_id:
+            return
+        movie_id, cast = int(movie_id), tuple(cast)
+        with self._lock:
+            row = self.rows.get(movie_id)
+            if row is not None and (not cast or self.has_cast[row]):
+                return
+            if row is None:
+                if len(self.records) >= self.max_movies:
+                    self.rejected += 1
+                    return
+                if len(self.records) == len(self.ids):
+                    self._grow()
+                row = self.rows[movie_id] = len(self.records)
+                self.records.append({})
+            self.matrix[row] = feature_vector(movie, cast)
+            self.ids[row] = movie_id
+            self.has_cast[row] = bool(cast)
+            self.records[row] = {k: movie.get(k) for k in RECORD_FIELDS}
+            self.dirty = True
+
+    def similar(self, movie_id: int, k: int = 6) -> list[dict]:
+        # 반환값: 유사도 높은 순 [{"id", "score", RECORD_FIELDS...}] (기준 영화 제외, 색인에 없으면 [])
+        with self._lock:
+            self.queries += 1
+            row = self.rows.get(int(movie_id))
+            n = len(self.records)
+            if row is None or n < 2:
+                return []
+            scores = self.matrix[:n] @ self.matrix[row]
+            ids, records = self.ids[:n].copy(), self.records[:n]
+        scores[row] = -np.inf
+        k = min(k, n - 1)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [dict(records[i], id=int(ids[i]), score=float(scores[i])) for i in top]
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            n = len(self.records)
+            arrays = {
+                "matrix": self.matrix[:n].copy(),
+                "ids": self.ids[:n].copy(),
+                "has_cast": self.has_cast[:n].copy(),
+            }
+            meta = {"version": FEATURE_VERSION, "dim": DIM, "records": list(self.records)}
+            self.dirty = False
+        arrays["meta"] = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, max_movies: int = MAX_MOVIES) -> "SimilarityIndex":
+        # 파일이 없거나 특징 배치가 다르면 빈 색인
+        index = cls(max_movies=max_movies)
+        if not os.path.exists(path):
+            return index
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            if meta.get("version") != FEATURE_VERSION or meta.get("dim") != DIM:
+                return index
+            n = min(len(meta["records"]), index.max_movies)
+            capacity = max(n, len(index.ids))
+            index.matrix = np.zeros((capacity, DIM), dtype=np.float32)
+            index.ids = np.zeros(capacity, dtype=np.int64)
+            index.has_cast = np.zeros(capacity, dtype=bool)
+            index.matrix[:n] = data["matrix"][:n]
+            index.ids[:n] = data["ids"][:n]
+            index.has_cast[:n] = data["has_cast"][:n]
+        index.records = meta["records"][:n]
+        index.rows = {int(movie_id): row for row, movie_id in enumerate(index.ids[:n])}
+        return index
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "movies": len(self.records),
+                "with_cast": int(self.has_cast[: len(self.records)].sum()),
+                "capacity": len(self.ids),
+                "bytes": self.matrix.nbytes + self.ids.nbytes + self.has_cast.nbytes,
+                "rejected": self.rejected,
+                "queries": self.queries,
+            }
+
+    def collect_metrics(self) -> list[tuple]:
+        s = self.stats()
+        return [
+            ("similar_index_movies", "gauge", {}, s["movies"]),
+            ("similar_index_bytes", "gauge", {}, s["bytes"]),
+            ("similar_index_queries_total", "counter", {}, s["queries"]),
+        ]
+
+
+@st.cache_resource(show_spinner=False)
+def get_similar_index() -> SimilarityIndex:
+    # 프로세스 공용 색인 (TMDB_SIMILAR_PATH="" 이면 저장하지 않고 메모리에만)
+    path = os.environ.get("TMDB_SIMILAR_PATH", DEFAULT_INDEX_PATH)
+    max_movies = int(os.environ.get("TMDB_SIMILAR_MAX", str(MAX_MOVIES)))
+    try:
+        index = SimilarityIndex.load(path, max_movies) if path else SimilarityIndex(max_movies=max_movies)
+    except (OSError, ValueError, KeyError):
+        index = SimilarityIndex(max_movies=max_movies)
+    metrics.REGISTRY.register_collector(index.collect_metrics)
+    if not path:
+        return index
+
+    def save() -> None:
+        if index.dirty:
+            try:
+                index.save(path)
+            except OSError:
+                pass
+
+    def loop() -> None:
+        while True:
+            time.sleep(SAVE_INTERVAL)
+            save()
+
+    threading.Thread(target=loop, name="similar-save", daemon=True).start()
+    atexit.register(save)
+    return index
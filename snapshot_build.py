@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit import logger as st_logger
+
+from catalog import SORT_KEYS
+from recommender import AGE_PRESET, DEFAULT_FILTERS, pick_candidates, snapshot_record
+from scoring import GENRES
+from snapshots import DEFAULT_SNAPSHOT_PATH, snapshot_key, write_snapshot
+from tmdb import movie_details
+
+# =========================================================
+# 추천 스냅샷 빌드 (snapshots.py)
+# - 가능한 조합 전부: 장르(top1, top2 또는 단독) × 국가 3 × 언어 × 정렬 2 × 연령대 최소 평가 수
+#   (평점 범위는 사이드바 기본값만; 다른 값은 앱에서 라이브 경로로 계산)
+# - 조합마다 앱과 같은 pick_candidates + 상세 정보를 계산해 파일 하나로 저장 후 원자적으로 교체
+# - 상세 정보를 못 받은 조합은 넣지 않음 → 앱이 라이브 경로로 계산
+# =========================================================
+COUNTRY_MODES = ["모두", "한국영화", "외국영화"]
+
+
+def snapshot_queries(languages: list[str]):
+    pairs = [(g, None) for g in GENRES] + [(a, b) for a in GENRES for b in GENRES if a != b]
+    min_vote_counts = sorted({p["min_vote_count"] for p in AGE_PRESET.values()})
+    for top1, top2 in pairs:
+        for language in languages:
+            for country_mode in COUNTRY_MODES:
+                for sort_by in SORT_KEYS:
+                    for min_vote_count in min_vote_counts:
+                        f = dict(
+                            DEFAULT_FILTERS,
+                            language=language,
+                            sort_by=sort_by,
+                            country_mode=country_mode,
+                            min_vote_count=min_vote_count,
+                        )
+                        yield top1, top2, f
+
+
+def build_entry(top1: str, top2: str | None, f: dict, api_key: str | None, v4_token: str | None) -> list[dict]:
+    top_list = [m for m in pick_candidates(top1, top2, f, api_key, v4_token) if m.get("id")]
+    return [snapshot_record(m, movie_details(api_key, v4_token, int(m["id"]), f["language"])) for m in top_list]
+
+
+def build_snapshot(
+    languages: list[str], api_key: str | None, v4_token: str | None, workers: int, log=None
+) -> tuple[dict, int]:
+    # 반환값: (키 → 영화 레코드 목록, 실패한 조합 수)
+    queries = list(snapshot_queries(languages))
+    entries, failed = {}, 0
+
+    def run(query):
+        top1, top2, f = query
+        try:
+            return snapshot_key(top1, top2, f), build_entry(top1, top2, f, api_key, v4_token)
+        except Exception:
+            return snapshot_key(top1, top2, f), None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for n, (key, movies) in enumerate(pool.map(run, queries), 1):
+            if movies is None:
+                failed += 1
+            else:
+                entries[key] = movies
+            if log and n % 100 == 0:
+                log(f"{n}/{len(queries)} 조합 (실패 {failed})")
+    return entries, failed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="모든 추천 조합을 미리 계산해 스냅샷 파일을 만듭니다.")
+    parser.add_argument("--language", action="append", help="여러 번 지정 가능 (기본: ko-KR, en-US)")
+    parser.add_argument("-o", "--output", default=os.environ.get("TMDB_SNAPSHOT_PATH") or DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument("-w", "--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+    st_logger.set_log_level("error")
+
+    api_key = os.environ.get("TMDB_API_KEY")
+    v4_token = os.environ.get("TMDB_V4_TOKEN")
+    if not api_key and not v4_token:
+        print("TMDB_API_KEY 또는 TMDB_V4_TOKEN 환경 변수를 설정해 주세요.", file=sys.stderr)
+        return 2
+
+    languages = args.language or ["ko-KR", "en-US"]
+    started = time.time()
+    entries, failed = build_snapshot(languages, api_key, v4_token, args.workers, log=print)
+    version = write_snapshot(args.output, entries, {"languages": languages, "built_at": started})
+    print(f"{args.output}: {len(entries)}개 조합 저장 (실패 {failed}, 버전 {version}, {time.time() - started:.1f}초)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+# =========================================================
+# 추천 스냅샷 (미리 계산한 결과 파일)
+# - 질문 채점 결과(장르 조합) × 국가 × 언어 × 정렬 × 연령대 최소 평가 수 조합마다
+#   후보 목록과 slim 상세 정보를 미리 계산해 파일 하나에 저장 (빌드: snapshot_build.py)
+# - 파일은 mmap으로 열고 조회는 키 → (시작, 개수) → 영화 레코드 오프셋으로 바로 찾음(상수 시간)
+#   영화 레코드는 조합끼리 공유하고, 필요할 때만 디코딩
+# - 새 스냅샷은 임시 파일에 쓴 뒤 os.replace로 교체 → 읽는 쪽은 항상 완전한 한 버전만 봄
+#   (이미 열린 mmap은 이전 파일을 계속 가리키므로 교체 중인 요청도 안전)
+#
+# 파일 구조
+#   MAGIC(8) | 헤더 길이(u64) | 헤더 JSON | 8바이트 정렬 |
+#   영화 레코드 오프셋 u64[영화 수 + 1] | 조합별 영화 번호 u32[전체 개수] | 영화 레코드(JSON) 이어붙임
+# =========================================================
+SNAPSHOT_MAGIC = b"MVSNAP\x00\x01"
+SNAPSHOT_FORMAT = 1
+DEFAULT_SNAPSHOT_PATH = os.path.join(".cache", "snapshot.bin")
+
+
+def snapshot_key(top1: str, top2: str | None, f: dict) -> str:
+    # 결과에 영향을 주는 값만 (평점 범위는 슬라이더 값 그대로라 0.1 단위로 맞춤)
+    return "|".join(
+        [
+            top1,
+            top2 or "",
+            f["language"],
+            f["sort_by"],
+            f["country_mode"],
+            str(int(f["min_vote_count"])),
+            f"{round(float(f['vote_avg_min']), 1):.1f}",
+            f"{round(float(f['vote_avg_max']), 1):.1f}",
+        ]
+    )
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class Snapshot:
+    def __init__(self, path: str):
+        with open(path, "rb") as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"스냅샷 파일이 아니에요: {path}")
+        (header_len,) = struct.unpack_from("<Q", self._mm, len(SNAPSHOT_MAGIC))
+        start = len(SNAPSHOT_MAGIC) + 8
+        header = json.loads(self._mm[start : start + header_len])
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"지원하지 않는 스냅샷 형식: {header.get('format')}")
+        self.path = path
+        self.version = header["version"]
+        self.meta = header["meta"]
+        self.entries: dict[str, list[int]] = header["entries"]
+
+        pos = _align(start + header_len)
+        n_movies, n_members = header["movies"], header["members"]
+        self._offsets = np.frombuffer(self._mm, dtype="<u8", count=n_movies + 1, offset=pos)
+        pos += 8 * (n_movies + 1)
+        self._members = np.frombuffer(self._mm, dtype="<u4", count=n_members, offset=pos)
+        self._blob = pos + 4 * n_members
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def movie(self, i: int) -> dict:
+        lo, hi = int(self._offsets[i]), int(self._offsets[i + 1])
+        return json.loads(self._mm[self._blob + lo : self._blob + hi])
+
+    def lookup(self, key: str) -> list[dict] | None:
+        # 없는 조합이면 None → 호출 측이 라이브 경로로 계산
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        start, count = entry
+        return [self.movie(int(i)) for i in self._members[start : start + count]]
+
+
+def write_snapshot(path: str, entries: dict[str, list[dict]], meta: dict) -> str:
+    # entries: 키 → 영화 레코드 목록. 같은 레코드는 한 번만 저장. 반환값: 버전 문자열
+    records: dict[bytes, int] = {}
+    members, index = [], {}
+    for key, movies in entries.items():
+        index[key] = [len(members), len(movies)]
+        for m in movies:
+            raw = json.dumps(m, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+            members.append(records.setdefault(raw, len(records)))
+
+    blob = b"".join(records)
+    offsets = np.zeros(len(records) + 1, dtype="<u8")
+    offsets[1:] = np.cumsum([len(r) for r in records], dtype=np.uint64)
+    version = time.strftime("%Y%m%d%H%M%S") + "-" + hashlib.sha256(blob).hexdigest()[:8]
+    header = json.dumps(
+        {
+            "format": SNAPSHOT_FORMAT,
+            "version": version,
+            "meta": dict(meta, built_at=meta.get("built_at", time.time())),
+            "entries": index,
+            "movies": len(records),
+            "members": len(members),
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    # 임시 파일에 쓴 뒤 교체 → 앱이 읽는 도중 반쯤 쓰인 파일을 보지 않음
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as fp:
+        fp.write(SNAPSHOT_MAGIC)
+        fp.write(struct.pack("<Q", len(header)))
+        fp.write(header)
+        fp.write(b"\x00" * (_align(fp.tell()) - fp.tell()))
+        fp.write(offsets.tobytes())
+        fp.write(np.asarray(members, dtype="<u4").tobytes())
+        fp.write(blob)
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(tmp, path)
+    return version
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+
+from catalog import PAGE_SIZE, SORT_KEYS
+
+# =========================================================
+# 후보 상위 집합(superset)
+# - (장르 조합, 언어, 국가 범위)마다 가장 넓은 필터로 여러 페이지를 받아 모아둔 영화들
+# - 정렬 기준별로 "이 값보다 큰 영화는 전부 받았다"는 floor를 기록(catalog.py와 같은 방식)
+#   → 평점 범위/최소 평가 수/외국영화 필터와 정렬 변경을 TMDB 호출 없이 로컬에서 응답
+# - 보장할 수 없는 조건이면 None → 호출 측이 네트워크로 보냄
+# =========================================================
+# superset을 받을 때의 최소 평가 수: 이보다 낮은 min_vote_count 요청은 로컬로 보장할 수 없음
+SUPERSET_MIN_VOTE_COUNT = 25
+
+
+class CandidateSuperset:
+    def __init__(self, scope: str, min_vote_count: int = SUPERSET_MIN_VOTE_COUNT):
+        self.scope = scope
+        self.min_vote_count = int(min_vote_count)
+        self.movies: dict[int, dict] = {}
+        # sort_by -> {"floor": float, "exhausted": bool}
+        self.coverage: dict[str, dict] = {}
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, sort_by: str, pages: list[list[dict]], first_page: int = 1) -> None:
+        # pages: first_page부터 연속으로 받은 discover 결과들(first_page > 1이면 이미 받은 페이지에 이어 붙임)
+        with self._lock:
+            if first_page != self._pages(sort_by) + 1:
+                return  # 다른 호출이 먼저 채움
+            self._add(sort_by, pages, first_page)
+
+    def _add(self, sort_by: str, pages: list[list[dict]], first_page: int) -> None:
+        key = SORT_KEYS[sort_by]
+        prev = self.coverage.get(sort_by)
+        floor = prev["floor"] if prev is not None else float("inf")
+        exhausted, fetched = False, first_page - 1
+        for results in pages:
+            fetched += 1
+            for m in results:
+                if not m.get("id"):
+                    continue
+                self.movies[int(m["id"])] = m
+                floor = min(floor, float(m.get(key) or 0.0))
+            if len(results) < PAGE_SIZE:
+                exhausted = True
+                break
+        self.coverage[sort_by] = {
+            "floor": floor if floor != float("inf") else 0.0,
+            "exhausted": exhausted,
+            "pages": fetched,
+        }
+
+    def _pages(self, sort_by: str) -> int:
+        c = self.coverage.get(sort_by)
+        return c["pages"] if c is not None else 0
+
+    def pages(self, sort_by: str) -> int:
+        # 이 정렬로 1페이지부터 연속으로 받은 페이지 수
+        with self._lock:
+            return self._pages(sort_by)
+
+    def can_grow(self, sort_by: str, max_pages: int) -> bool:
+        # 페이지를 더 받으면 보장 범위가 넓어지는지(끝까지 받았거나 max_pages에 닿았으면 False)
+        with self._lock:
+            if any(c["exhausted"] for c in self.coverage.values()):
+                return False
+            return self._pages(sort_by) < max_pages
+
+    def covers(self, sort_by: str) -> bool:
+        # 이 정렬로 받은 적이 있거나, 다른 정렬로 끝까지 받아 전체 집합을 이미 알고 있음
+        return sort_by in self.coverage or any(c["exhausted"] for c in self.coverage.values())
+
+    def _floor(self, sort_by: str) -> float:
+        if any(c["exhausted"] for c in self.coverage.values()):
+            return float("-inf")
+        return self.coverage[sort_by]["floor"]
+
+    def query(
+        self,
+        sort_by: str,
+        page: int,
+        min_vote_count: int,
+        vote_avg_min: float,
+        vote_avg_max: float,
+        country_mode: str,
+    ) -> list[dict] | None:
+        if sort_by not in SORT_KEYS or int(min_vote_count) < self.min_vote_count:
+            return None
+        with self._lock:
+            if not self.covers(sort_by):
+                return None
+            floor = self._floor(sort_by)
+            movies = list(self.movies.values())
+        key = SORT_KEYS[sort_by]
+        vmin, vmax = round(float(vote_avg_min), 1), round(float(vote_avg_max), 1)
+        rows = [
+            m
+            for m in movies
+            if (m.get("vote_count") or 0) >= int(min_vote_count)
+            and vmin <= (m.get("vote_average") or 0.0) <= vmax
+            and not (country_mode == "외국영화" and m.get("original_language") == "ko")
+            # floor보다 큰 값만 "빠짐없이 수집됨"이 보장됨
+            and float(m.get(key) or 0.0) > floor
+        ]
+        start, stop = (int(page) - 1) * PAGE_SIZE, int(page) * PAGE_SIZE
+        if len(rows) < stop and floor != float("-inf"):
+            return None
+        rows.sort(key=lambda m: (-float(m.get(key) or 0.0), int(m["id"])))
+        return rows[start:stop]
+
+
+class SupersetRegistry:
+    # 프로세스 공용 superset 모음 (오래된 항목은 ttl 후 버리고, max_entries 초과 시 LRU로 정리)
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items: OrderedDict[tuple, CandidateSuperset] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, scope: str) -> CandidateSuperset:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item.created_at < time.time() - self.ttl:
+                item = CandidateSuperset(scope)
+                self._items[key] = item
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+            return item
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._items), "hits": self.hits, "misses": self.misses}
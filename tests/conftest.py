@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+import streamlit as st
+
+# 저장소 루트의 모듈(tmdb, recommender, ...)과 bench 패키지를 import 할 수 있게
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fake_tmdb import FakeTMDB  # noqa: E402
+
+
+@pytest.fixture
+def fake_tmdb(tmp_path, monkeypatch):
+    # 가짜 TMDB 서버 + 작업 디렉터리 밖에 아무것도 쓰지 않는 설정 (추측 prefetch는 기본값 그대로 켬)
+    fake = FakeTMDB(latency=0.01, seed=0).start()
+    monkeypatch.setenv("TMDB_API_BASE", fake.base_url)
+    monkeypatch.setenv("TMDB_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("TMDB_CATALOG_DIR", str(tmp_path / "catalog"))
+    monkeypatch.setenv("TMDB_SNAPSHOT_PATH", "")
+    monkeypatch.setenv("POSTER_CACHE_DIR", "")
+    monkeypatch.setenv("TMDB_SIMILAR_PATH", "")
+    monkeypatch.setenv("TMDB_RATE_LIMIT_RPS", "1000")
+    monkeypatch.setenv("TMDB_RATE_LIMIT_BURST", "1000")
+    monkeypatch.delenv("PREFETCH_SESSION_BUDGET", raising=False)
+    import tmdb
+
+    # TMDB_API_BASE는 import 시점에 읽히고, 공용 getter(st.cache_resource)는 환경 변수를 한 번만 읽음
+    monkeypatch.setattr(tmdb, "TMDB_API_BASE", fake.base_url)
+    st.cache_resource.clear()
+    try:
+        yield fake
+    finally:
+        fake.stop()
+        st.cache_resource.clear()
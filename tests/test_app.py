@@ -0,0 +1,26 @@
+import os
+import time
+
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def test_results_and_more_with_speculative_prefetch(fake_tmdb):
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.run()
+    at.sidebar.text_input[0].input("test").run()
+    # 답을 바꾸면 백그라운드에서 추측 prefetch가 돎 → 스크립트 실행이 끝난 뒤에도 세션에 아무것도 보내면 안 됨
+    radio = at.radio(key="q1")
+    radio.set_value(radio.options[1]).run()
+    time.sleep(0.5)
+
+    [b for b in at.button if b.label == "결과 보기"][0].click().run()
+    assert not at.exception
+    shown = len(at.session_state["results"]["result"]["movies"])
+    assert shown > 0
+    # 결과 화면에서 다음 페이지 prefetch가 도는 동안 "더 보기"
+    time.sleep(0.5)
+    [b for b in at.button if b.label == "더 보기"][0].click().run()
+    assert not at.exception
+    assert len(at.session_state["results"]["result"]["movies"]) > shown
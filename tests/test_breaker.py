@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from breaker import CircuitBreaker, CircuitOpen
+
+
+def tripped(reset_timeout: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=reset_timeout)
+    for _ in range(3):
+        breaker.check("discover")
+        breaker.record_failure("discover")
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure("discover")
+    breaker.record_failure("discover")
+    breaker.record_success("discover")  # 연속 실패만 셈
+    breaker.record_failure("discover")
+    breaker.record_failure("discover")
+    assert breaker.state("discover") == "closed"
+    breaker.record_failure("discover")
+    assert breaker.state("discover") == "open"
+    with pytest.raises(CircuitOpen):
+        breaker.check("discover")
+    # 엔드포인트별로 따로 셈
+    assert breaker.allow("movie_details")
+    assert breaker.stats()["trips"] == 1
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = tripped()
+    time.sleep(0.06)
+    assert breaker.state("discover") == "half-open"
+    assert breaker.allow("discover")
+    assert not breaker.allow("discover")
+
+
+def test_successful_probe_closes():
+    breaker = tripped()
+    time.sleep(0.06)
+    assert breaker.allow("discover")
+    breaker.record_success("discover")
+    assert breaker.state("discover") == "closed"
+    assert breaker.allow("discover") and breaker.allow("discover")
+
+
+def test_failed_probe_reopens():
+    breaker = tripped()
+    time.sleep(0.06)
+    assert breaker.allow("discover")
+    breaker.record_failure("discover")
+    assert breaker.state("discover") == "open"
+    assert not breaker.allow("discover")
+    assert breaker.stats()["trips"] == 2
+
+
+def test_released_probe_reopens_without_blocking_forever():
+    breaker = tripped()
+    time.sleep(0.06)
+    assert breaker.allow("discover")
+    breaker.release("discover")
+    assert breaker.state("discover") == "open"
+    time.sleep(0.06)
+    assert breaker.allow("discover")
+
+
+def test_release_while_closed_is_not_a_failure():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.release("discover")
+    assert breaker.state("discover") == "closed"
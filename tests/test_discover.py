@@ -0,0 +1,45 @@
+from catalog import PAGE_SIZE
+
+
+def discover(page: int, vote_avg_min: float = 7.1, vote_avg_max: float = 7.2):
+    from tmdb import discover_movies_page
+
+    return discover_movies_page(
+        api_key="test",
+        v4_token=None,
+        with_genres="18",
+        language="ko-KR",
+        sort_by="popularity.desc",
+        page=page,
+        min_vote_count=0,
+        vote_avg_min=vote_avg_min,
+        vote_avg_max=vote_avg_max,
+        country_mode="모두",
+    )
+
+
+def test_narrow_vote_range_pages_by_upstream_page_size(fake_tmdb):
+    # 넓힌(0.5 단위) 페이지를 정확한 범위로 거르면 짧아지지만 업스트림에는 다음 페이지가 있음
+    results, has_more = discover(1)
+    assert len(results) < PAGE_SIZE
+    assert has_more
+    assert all(7.1 <= m["vote_average"] <= 7.2 for m in results)
+    more, _ = discover(2)
+    assert {m["id"] for m in more}.isdisjoint(m["id"] for m in results)
+
+
+def test_pick_candidates_keeps_paging_after_short_filtered_page(fake_tmdb):
+    from recommender import RESULT_COUNT, pick_candidates
+
+    first, _ = discover(1)
+    f = {
+        "language": "ko-KR",
+        "sort_by": "popularity.desc",
+        "vote_avg_min": 7.1,
+        "vote_avg_max": 7.2,
+        "country_mode": "모두",
+        "min_vote_count": 0,
+    }
+    candidates = pick_candidates("드라마", None, f, "test", None)
+    assert len(first) < RESULT_COUNT
+    assert len(candidates) > len(first)
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from memcache import BoundedCache, CacheRegistry, approx_size, memoize
+
+
+def value(n: int) -> str:
+    return "x" * n
+
+
+def test_byte_budget_evicts_least_recently_used():
+    size = approx_size(value(100))
+    cache = BoundedCache("t", max_bytes=3 * size, max_entries=100)
+    for key in "abc":
+        cache.set(key, value(100))
+    assert cache.get("a") == (True, value(100))  # a를 최근에 씀
+    cache.set("d", value(100))
+
+    assert cache.get("b") == (False, None)
+    assert all(cache.get(k)[0] for k in "acd")
+    stats = cache.stats()
+    assert stats["bytes"] <= 3 * size
+    assert stats["evictions"] == 1
+
+
+def test_values_larger_than_budget_are_rejected():
+    cache = BoundedCache("t", max_bytes=approx_size(value(100)), max_entries=100)
+    cache.set("small", value(10))
+    cache.set("big", value(1000))
+    assert cache.get("big") == (False, None)
+    assert cache.get("small") == (True, value(10))
+    assert cache.stats()["rejected"] == 1
+
+
+def test_replacing_a_key_does_not_double_count_bytes():
+    cache = BoundedCache("t", max_bytes=10**6, max_entries=100)
+    cache.set("k", value(100))
+    cache.set("k", value(10))
+    assert cache.stats()["bytes"] == approx_size(value(10))
+    assert cache.stats()["entries"] == 1
+
+
+def test_max_entries_limit():
+    cache = BoundedCache("t", max_bytes=10**6, max_entries=2)
+    for key in "abc":
+        cache.set(key, key)
+    assert cache.stats()["entries"] == 2
+    assert cache.get("a") == (False, None)
+
+
+def test_lfu_keeps_frequently_used_entries():
+    cache = BoundedCache("t", max_bytes=10**6, max_entries=2, policy="lfu")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    for _ in range(3):
+        cache.get("a")
+    cache.get("b")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+
+
+def test_ttl_expiry():
+    cache = BoundedCache("t", max_bytes=10**6, max_entries=10, ttl=0.05)
+    cache.set("k", 1)
+    assert cache.get("k") == (True, 1)
+    time.sleep(0.1)
+    assert cache.get("k") == (False, None)
+    stats = cache.stats()
+    assert stats["expired"] == 1 and stats["bytes"] == 0
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedCache("t", max_bytes=1, max_entries=1, policy="fifo")
+
+
+def test_memoize_ignores_underscore_arguments():
+    registry = CacheRegistry({"f": {"max_bytes": 10**6, "max_entries": 10}})
+    calls = []
+
+    @memoize(lambda: registry, "f")
+    def f(x, _api_key=None):
+        calls.append(x)
+        return x * 2
+
+    assert f(1, _api_key="a") == 2
+    assert f(1, _api_key="b") == 2
+    assert calls == [1]
+    f.clear()
+    f(1)
+    assert calls == [1, 1]
@@ -0,0 +1,63 @@
+import threading
+import time
+from email.utils import formatdate
+
+from ratelimit import PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, RateLimiter, parse_retry_after
+
+
+def test_burst_then_rate_limited():
+    limiter = RateLimiter(rate=20, burst=3)
+    t0 = time.monotonic()
+    for _ in range(3):
+        assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=1)
+    assert time.monotonic() - t0 >= 0.03
+
+
+def test_interactive_waiters_go_before_prefetch():
+    limiter = RateLimiter(rate=20, burst=1)
+    assert limiter.acquire()
+    order, lock = [], threading.Lock()
+
+    def worker(name, priority):
+        limiter.acquire(priority)
+        with lock:
+            order.append(name)
+
+    # 백그라운드 호출이 먼저 줄을 서 있어도 사용자 호출이 먼저 토큰을 받음
+    threads = [threading.Thread(target=worker, args=(f"prefetch{i}", PRIORITY_PREFETCH)) for i in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=worker, args=("interactive", PRIORITY_INTERACTIVE))
+    interactive.start()
+    for t in threads + [interactive]:
+        t.join()
+    assert order[0] == "interactive"
+
+
+def test_pause_blocks_until_retry_after():
+    limiter = RateLimiter(rate=1000, burst=10)
+    limiter.pause(0.2)
+    t0 = time.monotonic()
+    assert not limiter.acquire(timeout=0.05)
+    assert limiter.acquire(timeout=1)
+    assert time.monotonic() - t0 >= 0.19
+    assert limiter.stats()["pauses"] == 1
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after({"Retry-After": "3"}) == 3.0
+    assert parse_retry_after({"Retry-After": "-1"}) == 0.0
+    seconds = parse_retry_after({"Retry-After": formatdate(time.time() + 30, usegmt=True)})
+    assert 25 <= seconds <= 30
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after(None) is None
+
+
+def test_parse_retry_after_rate_limit_headers():
+    reset = str(int(time.time()) + 10)
+    seconds = parse_retry_after({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+    assert 8 <= seconds <= 10
+    assert parse_retry_after({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": reset}) is None
@@ -0,0 +1,149 @@
+import itertools
+
+import numpy as np
+
+from scoring import GENRE_ORDER, GENRES, QUESTIONS, TIE_BREAK, VIEWER_MOOD, decide_genres_and_reasons, score_batch
+
+
+# 규칙 테이블로 바꾸기 전의 if/elif 채점(기준 구현) 그대로
+def baseline_decide(answers: dict, viewer_mood: str):
+    scores = {g: 0 for g in GENRES.keys()}
+    reasons_pool = {g: [] for g in GENRES.keys()}
+
+    def add(g, pts, reason):
+        if g not in scores:  # 원본의 "어드벤처" placeholder(0점, 빈 이유)는 GENRES에 없음
+            return
+        scores[g] += pts
+        reasons_pool[g].append(reason)
+
+    # Q1: 실제 영화 상황 가정
+    # "정체불명의 초대장을 받았다! 당신의 첫 행동은?"
+    if answers["q1"] == "수상하지만 일단 따라가 본다":
+        add("액션", 2, "사건의 중심으로 직접 뛰어드는 전개를 선택했어요.")
+        add("어드벤처", 0, "")  # placeholder (미사용)
+    elif answers["q1"] == "단서를 모으며 조심히 접근한다":
+        add("SF", 2, "설정과 단서를 따라가는 몰입형 전개가 잘 맞아요.")
+        add("드라마", 1, "인물의 내적 판단/긴장도 함께 즐길 수 있어요.")
+    elif answers["q1"] == "누군가와 함께 움직이며 관계를 확인한다":
+        add("로맨스", 2, "관계 중심의 설렘/감정선이 중요한 편이에요.")
+        add("드라마", 1, "인물 간 감정 변화에 몰입하는 타입이에요.")
+    elif answers["q1"] == "농담 한마디로 분위기부터 푼다":
+        add("코미디", 2, "웃음과 텐션이 있는 장면을 좋아해요.")
+
+    # Q2: 실제 영화 상황 가정
+    # "친구가 갑자기 이별을 당했다. 당신의 행동은?"
+    if answers["q2"] == "조용히 옆에 있어준다":
+        add("드라마", 2, "잔잔하지만 깊은 감정선을 선호해요.")
+        add("로맨스", 1, "관계의 온도/서사를 중요하게 여겨요.")
+    elif answers["q2"] == "맛있는 걸 사주며 웃기려 한다":
+        add("코미디", 2, "기분 전환 포인트가 중요한 편이에요.")
+        add("로맨스", 1, "따뜻한 관계 중심 이야기에도 끌려요.")
+    elif answers["q2"] == "바로 밖으로 끌고 나가 땀 빼게 한다":
+        add("액션", 2, "에너지 넘치는 전개를 선호할 가능성이 커요.")
+    elif answers["q2"] == "현실적인 조언 + 해결책을 같이 찾는다":
+        add("SF", 1, "문제 해결/전개 구조가 명확한 이야기를 좋아할 수 있어요.")
+        add("드라마", 2, "현실 공감/해결 서사에 끌려요.")
+
+    # Q3: 사용자 요구대로 교체
+    # 종강 후 여행! 친구와 떠날 때 내 역할?
+    if answers["q3"] == "계획형":
+        add("드라마", 2, "흐름이 탄탄한 서사에 안정감을 느껴요.")
+        add("SF", 1, "논리적 전개/설정도 즐길 수 있어요.")
+    elif answers["q3"] == "즉흥적이지만 계획에 수긍":
+        add("로맨스", 2, "우연/설렘/케미가 있는 전개에 강해요.")
+        add("코미디", 1, "즉흥에서 생기는 웃긴 상황도 좋아해요.")
+    elif answers["q3"] == "액티비티는 무조건!":
+        add("액션", 2, "박진감 넘치는 액티비티/사건 전개가 찰떡이에요.")
+        add("판타지", 1, "스케일 큰 모험도 좋아할 수 있어요.")
+    elif answers["q3"] == "여행은 힐링이지":
+        add("로맨스", 2, "따뜻하고 편안한 분위기의 영화가 잘 맞아요.")
+        add("드라마", 1, "잔잔한 여운도 좋아할 수 있어요.")
+
+    # Q4: 실제 영화 상황 가정
+    # "새로운 세계로 포탈이 열렸다. 당신의 선택은?"
+    if answers["q4"] == "망설임 없이 들어간다":
+        add("액션", 2, "모험/돌파형 전개에 끌려요.")
+        add("판타지", 1, "이세계/마법 같은 설정에 매력을 느껴요.")
+    elif answers["q4"] == "규칙을 파악하고 안전장치부터":
+        add("SF", 2, "규칙/설정 기반 세계관에 몰입하는 편이에요.")
+        add("드라마", 1, "신중한 캐릭터 중심 서사도 좋아할 수 있어요.")
+    elif answers["q4"] == "같이 들어갈 동료부터 찾는다":
+        add("로맨스", 2, "관계 중심의 케미와 팀워크를 좋아해요.")
+        add("드라마", 1, "감정선이 있는 전개와도 잘 맞아요.")
+    elif answers["q4"] == "일단 상황을 웃기게 정리한다":
+        add("코미디", 2, "유머로 풀어가는 전개가 취향이에요.")
+
+    # Q5: 실제 영화 상황 가정
+    # "마지막 결말을 바꿀 수 있다면?"
+    if answers["q5"] == "모두가 행복한 결말":
+        add("로맨스", 2, "따뜻한 감정의 완결감을 좋아해요.")
+        add("드라마", 1, "여운 있는 해피엔딩에 끌려요.")
+    elif answers["q5"] == "짜릿한 반전 결말":
+        add("SF", 2, "설정/반전/아이디어의 쾌감을 좋아해요.")
+        add("판타지", 1, "예상 밖의 전개도 즐길 수 있어요.")
+    elif answers["q5"] == "악당을 통쾌하게 제압":
+        add("액션", 2, "카타르시스 있는 결말이 찰떡이에요.")
+    elif answers["q5"] == "웃기게 마무리(쿠키영상까지!)":
+        add("코미디", 2, "끝까지 즐겁게 웃는 영화가 좋아요.")
+
+    # 관람자 기분 상태 가중치(요구사항)
+    for g in VIEWER_MOOD.get(viewer_mood, []):
+        if g in scores:
+            scores[g] += 1
+            reasons_pool[g].append(f"지금 기분(“{viewer_mood}”)에 {g} 장르가 잘 어울려요.")
+
+    # 연령대는 추천 안정화를 위해 아주 약하게만 반영(점수에는 영향 X)
+    # (min_vote_count 등 필터에서 반영)
+
+    # top1/top2
+    sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    top_score = sorted_scores[0][1]
+    top_candidates = [g for g, s in sorted_scores if s == top_score]
+    top1 = next((g for g in TIE_BREAK if g in top_candidates), sorted_scores[0][0])
+
+    top2 = None
+    if len(sorted_scores) > 1:
+        second_score = sorted_scores[1][1]
+        if (top_score - second_score) <= 1 and second_score > 0:
+            second_candidates = [g for g, s in sorted_scores if s == second_score and g != top1]
+            if second_candidates:
+                top2 = next((g for g in TIE_BREAK if g in second_candidates), second_candidates[0])
+
+    def uniq_take(lst, k=3):
+        out = []
+        for x in lst:
+            if x and x not in out:
+                out.append(x)
+        return out[:k] if out else ["당신의 선택이 이 장르 분위기와 잘 맞아요."]
+
+    return scores, top1, top2, uniq_take(reasons_pool[top1], 3), (uniq_take(reasons_pool[top2], 2) if top2 else [])
+
+
+ALL_ANSWERS = [
+    dict(zip((q["key"] for q in QUESTIONS), combo))
+    for combo in itertools.product(*(list(q["options"]) for q in QUESTIONS))
+]
+
+
+def test_decide_matches_baseline_for_every_answer_and_mood():
+    for viewer_mood in VIEWER_MOOD:
+        for answers in ALL_ANSWERS:
+            assert decide_genres_and_reasons(answers, viewer_mood, "20대") == baseline_decide(answers, viewer_mood)
+
+
+def test_score_batch_matches_baseline():
+    answer_sets = [a for a in ALL_ANSWERS for _ in VIEWER_MOOD]
+    moods = [m for _ in ALL_ANSWERS for m in VIEWER_MOOD]
+    scores, top1, top2 = score_batch(answer_sets, moods)
+    for i, (answers, viewer_mood) in enumerate(zip(answer_sets, moods)):
+        expected_scores, expected_top1, expected_top2, _, _ = baseline_decide(answers, viewer_mood)
+        assert scores[i].tolist() == [expected_scores[g] for g in GENRE_ORDER]
+        assert (top1[i], top2[i]) == (expected_top1, expected_top2)
+
+
+def test_score_batch_handles_unknown_mood():
+    answers = ALL_ANSWERS[0]
+    scores, top1, top2 = score_batch([answers], ["모르는 기분"])
+    expected_scores, expected_top1, expected_top2, _, _ = baseline_decide(answers, "모르는 기분")
+    assert np.array_equal(scores[0], [expected_scores[g] for g in GENRE_ORDER])
+    assert (top1[0], top2[0]) == (expected_top1, expected_top2)
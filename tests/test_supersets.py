@@ -0,0 +1,80 @@
+from catalog import PAGE_SIZE
+from supersets import CandidateSuperset
+
+POP = "popularity.desc"
+RATING = "vote_average.desc"
+
+
+def movie(i: int, popularity: float, vote_average: float = 7.0, lang: str = "en") -> dict:
+    return {"id": i, "popularity": popularity, "vote_average": vote_average, "vote_count": 100, "original_language": lang}
+
+
+def pages_by_popularity(n_pages: int, start: int = 0) -> list[list[dict]]:
+    # 인기도 내림차순 discover 결과(전부 가득 찬 페이지)
+    return [
+        [movie(i, 1000.0 - i) for i in range(start + p * PAGE_SIZE + 1, start + (p + 1) * PAGE_SIZE + 1)]
+        for p in range(n_pages)
+    ]
+
+
+def query(s: CandidateSuperset, sort_by: str = POP, page: int = 1, vmin: float = 0.0, vmax: float = 10.0, country="모두"):
+    return s.query(sort_by, page, min_vote_count=100, vote_avg_min=vmin, vote_avg_max=vmax, country_mode=country)
+
+
+def test_page_within_floor_is_answered_locally():
+    s = CandidateSuperset("t")
+    s.add(POP, pages_by_popularity(2))
+    rows = query(s)
+    assert [m["id"] for m in rows] == list(range(1, PAGE_SIZE + 1))
+    # floor(마지막 영화의 인기도)와 같은 값은 빠짐없이 받았다고 보장할 수 없어 2페이지는 모자람
+    assert query(s, page=2) is None
+
+
+def test_filtered_rows_short_of_the_page_fall_back_to_network():
+    s = CandidateSuperset("t")
+    pages = pages_by_popularity(2)
+    for m in pages[0][::2]:
+        m["vote_average"] = 9.0
+    s.add(POP, pages)
+    assert query(s, vmin=8.5) is None
+    # floor 아래 영화가 더 있을 수 있으므로 다른 정렬도 보장 못 함
+    assert query(s, sort_by=RATING) is None
+
+
+def test_exhausted_sort_covers_every_sort_and_page():
+    s = CandidateSuperset("t")
+    pages = pages_by_popularity(1) + [[movie(100, 1.0, vote_average=9.5)]]
+    s.add(POP, pages)
+    assert s.coverage[POP]["exhausted"]
+    rows = query(s, sort_by=RATING)
+    assert rows[0]["id"] == 100 and len(rows) == PAGE_SIZE
+    assert [m["id"] for m in query(s, page=2)] == [100]
+    assert query(s, page=3) == []
+    assert not s.can_grow(POP, max_pages=10)
+
+
+def test_continuation_pages_extend_the_floor():
+    s = CandidateSuperset("t")
+    s.add(POP, pages_by_popularity(1))
+    assert s.pages(POP) == 1
+    assert query(s) is None  # floor와 같은 마지막 영화 때문에 한 페이지가 안 됨
+    assert s.can_grow(POP, max_pages=3)
+
+    s.add(POP, pages_by_popularity(1, start=PAGE_SIZE), first_page=2)
+    assert s.pages(POP) == 2
+    assert [m["id"] for m in query(s)] == list(range(1, PAGE_SIZE + 1))
+
+    # 이미 받은 페이지를 다시 붙이거나 건너뛴 페이지는 무시
+    s.add(POP, pages_by_popularity(1, start=PAGE_SIZE), first_page=2)
+    s.add(POP, pages_by_popularity(1, start=5 * PAGE_SIZE), first_page=5)
+    assert s.pages(POP) == 2
+    assert not s.can_grow(POP, max_pages=2)
+
+
+def test_low_min_vote_count_and_foreign_filter():
+    s = CandidateSuperset("t")
+    pages = pages_by_popularity(1) + [[movie(100, 1.0, lang="ko")]]
+    s.add(POP, pages)
+    assert s.query(POP, 1, min_vote_count=0, vote_avg_min=0, vote_avg_max=10, country_mode="모두") is None
+    assert all(m["original_language"] != "ko" for m in query(s, page=2, country="외국영화"))
+    assert query(s, page=2, country="외국영화") == []
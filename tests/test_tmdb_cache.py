@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+import tmdb_cache
+from breaker import DeadlineExceeded, UpstreamUnavailable
+from tmdb_cache import DiskCache, SingleFlight, make_cache_key
+
+
+# -----------------------------
+# DiskCache
+# -----------------------------
+def test_cache_key_ignores_api_key():
+    url = "https://api.themoviedb.org/3/movie/1"
+    assert make_cache_key(url, {"language": "ko-KR", "api_key": "a"}) == make_cache_key(url, {"language": "ko-KR"})
+    assert make_cache_key(url, {"language": "ko-KR"}) != make_cache_key(url, {"language": "en-US"})
+
+
+def test_get_set_roundtrip_and_expiry(tmp_path):
+    cache = DiskCache(str(tmp_path / "c.sqlite3"))
+    cache.set("k", {"v": 1}, ttl=60)
+    assert cache.get("k") == {"v": 1}
+    cache.set("old", {"v": 2}, ttl=-1)
+    assert cache.get("old") is None
+    assert cache.lookup("old") is None
+
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(tmdb_cache, "TOUCH_INTERVAL", 0.0)
+    value = {"x": "a" * 100}
+    cache = DiskCache(str(tmp_path / "c.sqlite3"), max_bytes=350)
+    cache.set("a", value, ttl=60)
+    time.sleep(0.01)
+    cache.set("b", value, ttl=60)
+    time.sleep(0.01)
+    assert cache.get("a") == value  # a가 b보다 최근에 쓰임
+    time.sleep(0.01)
+    cache.set("c", value, ttl=60)
+    cache.set("d", value, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    stats = cache.stats()
+    assert stats["bytes"] <= 350
+    assert stats["bytes"] == cache._total
+
+
+def test_running_total_survives_replace_and_reopen(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    cache = DiskCache(path)
+    cache.set("k", {"x": "a" * 50}, ttl=60)
+    cache.set("k", {"x": "b" * 10}, ttl=60)
+    assert cache._total == cache.stats()["bytes"]
+    assert DiskCache(path)._total == cache.stats()["bytes"]
+
+
+def test_stale_entry_is_served_until_stale_ttl_and_renewed(tmp_path):
+    cache = DiskCache(str(tmp_path / "c.sqlite3"))
+    cache.set("k", {"v": 1}, ttl=-1, stale_ttl=60, etag='"e1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    entry = cache.lookup("k")
+    assert entry is not None and not entry.fresh
+    assert entry.value == {"v": 1}
+    assert (entry.etag, entry.last_modified) == ('"e1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+    # get()은 fresh 값만 돌려줌
+    assert cache.get("k") is None
+
+    # 304 Not Modified → 값은 그대로 두고 만료만 연장
+    cache.renew("k", ttl=60, stale_ttl=60)
+    entry = cache.lookup("k")
+    assert entry.fresh and entry.value == {"v": 1}
+
+
+def test_entries_past_stale_ttl_are_dropped(tmp_path):
+    cache = DiskCache(str(tmp_path / "c.sqlite3"))
+    cache.set("k", {"v": 1}, ttl=-2, stale_ttl=1)
+    assert cache.lookup("k") is None
+
+
+# -----------------------------
+# SingleFlight
+# -----------------------------
+def run_concurrently(n: int, target) -> list:
+    out, lock = [], threading.Lock()
+
+    def worker():
+        try:
+            value = target()
+        except Exception as e:
+            value = e
+        with lock:
+            out.append(value)
+
+    threads = [threading.Thread(target=worker) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight, calls = SingleFlight(), []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"v": 1}
+
+    results = run_concurrently(5, lambda: flight.do("k", fetch))
+    assert results == [{"v": 1}] * 5
+    assert len(calls) == 1
+    assert flight.stats()["coalesced"] == 4
+
+
+def test_shared_errors_reach_followers_without_retry():
+    flight = SingleFlight(shared=lambda e: isinstance(e, UpstreamUnavailable))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        raise UpstreamUnavailable("down")
+
+    results = run_concurrently(5, lambda: flight.do("k", fetch))
+    assert all(isinstance(r, UpstreamUnavailable) for r in results)
+    assert len(calls) == 1
+    assert flight.stats()["shared_errors"] == 4
+
+
+def test_caller_specific_errors_elect_one_new_leader():
+    flight = SingleFlight(shared=lambda e: isinstance(e, UpstreamUnavailable))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        if len(calls) == 1:
+            raise RuntimeError("401")
+        return {"v": 1}
+
+    results = run_concurrently(5, lambda: flight.do("k", fetch))
+    assert sorted(map(type, results), key=str) == [RuntimeError] + [dict] * 4
+    assert len(calls) == 2
+
+
+def test_follower_wait_is_bounded_by_deadline():
+    flight, release = SingleFlight(), threading.Event()
+    leader = threading.Thread(target=lambda: flight.do("k", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.05)
+    t0 = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        flight.do("k", lambda: None, deadline=time.monotonic() + 0.1)
+    assert time.monotonic() - t0 < 1.0
+    release.set()
+    leader.join()
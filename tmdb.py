@@ -0,0 +1,835 @@
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+import streamlit as st
+
+import metrics
+from breaker import CircuitBreaker, DeadlineExceeded, UpstreamUnavailable
+from catalog import DEFAULT_CATALOG_DIR, PAGE_SIZE, SCOPE_PARAMS, Catalog, catalog_path
+from httpclient import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_READ_TIMEOUT,
+    HEDGE_PRIMARY_WORKERS,
+    Hedger,
+    PooledClient,
+)
+from memcache import CacheRegistry, memoize
+from ratelimit import PRIORITY_ENRICHMENT, PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, RateLimiter, parse_retry_after
+from snapshots import DEFAULT_SNAPSHOT_PATH, Snapshot
+from supersets import SupersetRegistry
+from tmdb_cache import DEFAULT_CACHE_PATH, BackgroundRefresher, DiskCache, SingleFlight, make_cache_key
+
+# =========================================================
+# TMDB 접근 계층 (UI 없음)
+# - app.py(Streamlit)와 recommender.py(배치/CLI)가 함께 사용
+# - st.cache_resource와 메모리 캐시(memcache.py)는 Streamlit 런타임 밖에서도 동작
+# - 워커 스레드에는 세션의 ScriptRunContext를 붙이지 않음 → 공용 getter는 show_spinner=False(화면에 아무것도 보내지 않음)
+# =========================================================
+# TMDB API 주소 (벤치마크/테스트에서는 로컬 가짜 서버로 바꿔서 사용)
+TMDB_API_BASE = os.environ.get("TMDB_API_BASE", "https://api.themoviedb.org/3").rstrip("/")
+
+# 엔드포인트별 캐시 TTL(초) — 메모리 캐시와 디스크 캐시가 같은 값을 사용
+CONFIG_TTL = 60 * 60
+DISCOVER_TTL = 60 * 10
+DETAILS_TTL = 60 * 30
+
+# 엔드포인트별 메모리 캐시 예산 (TMDB_MEMCACHE_<ENDPOINT>_MB / _MAX_ENTRIES / _POLICY 로 조정)
+# - discover 한 페이지 ≈ 20KB, slim 상세 ≈ 1KB (approx_size 기준)
+MEMCACHE_LIMITS = {
+    "configuration": {"max_bytes": 1 * 1024 * 1024, "max_entries": 4, "ttl": CONFIG_TTL},
+    "discover": {"max_bytes": 64 * 1024 * 1024, "max_entries": 4000, "ttl": DISCOVER_TTL},
+    "details": {"max_bytes": 32 * 1024 * 1024, "max_entries": 20000, "ttl": DETAILS_TTL},
+    # TMDB 장애 시 대신 보여줄 조건별 마지막 정상 추천 결과(recommender.py)
+    "last_good": {"max_bytes": 16 * 1024 * 1024, "max_entries": 2000, "ttl": 60 * 60 * 24},
+}
+
+# 만료 후에도 이 시간(초) 동안은 지난 값을 바로 쓰고 백그라운드에서 갱신
+STALE_TTL = 60 * 60 * 24
+CONFIG_STALE_TTL = 60 * 60 * 24 * 7
+
+# 필터/정렬 변경을 로컬에서 응답하기 위해 조합마다 받아두는 최대 discover 페이지 수(필요할 때만 다음 페이지)
+SUPERSET_PAGES = 3
+
+# 로컬 카탈로그/추천 스냅샷이 이보다 오래되면 사용하지 않음(초)
+CATALOG_MAX_AGE = 60 * 60 * 24
+SNAPSHOT_MAX_AGE = 60 * 60 * 24
+
+# 429를 받았을 때 에러 대신 기다렸다 다시 시도하는 최대 횟수 / 한 번에 기다리는 최대 시간(초)
+RATE_LIMIT_MAX_RETRIES = 3
+RATE_LIMIT_MAX_WAIT = 10.0
+
+# 5xx/timeout/연결 실패 재시도 횟수와 첫 대기 시간(초, 매번 2배). 시간 예산(deadline) 안에서만 재시도
+SERVER_MAX_RETRIES = 2
+SERVER_RETRY_BACKOFF = 0.3
+
+# =========================================================
+# HTTP client (풀/timeout은 환경 변수로 조정)
+# =========================================================
+@st.cache_resource(show_spinner=False)
+def get_http_client() -> PooledClient:
+    # 429와 5xx 재시도는 여기(urllib3)가 아니라 _tmdb_send에서 시간 예산을 보며 처리
+    pool_maxsize = int(os.environ.get("TMDB_POOL_MAXSIZE", str(DEFAULT_POOL_MAXSIZE)))
+    return PooledClient(
+        pool_maxsize=pool_maxsize,
+        # 풀보다 많이 동시에 보내면 남는 커넥션은 버려지므로 기본값은 풀 크기와 같게
+        per_host_limit=int(os.environ.get("TMDB_PER_HOST_LIMIT", str(pool_maxsize))),
+        connect_timeout=float(os.environ.get("TMDB_CONNECT_TIMEOUT", str(DEFAULT_CONNECT_TIMEOUT))),
+        read_timeout=float(os.environ.get("TMDB_READ_TIMEOUT", str(DEFAULT_READ_TIMEOUT))),
+        keepalive=os.environ.get("TMDB_KEEPALIVE", "1") != "0",
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_hedger() -> Hedger | None:
+    # 느린 응답에 같은 GET을 한 번 더 보내는 hedging (TMDB_HEDGE=0 이면 비활성화)
+    if os.environ.get("TMDB_HEDGE", "1") == "0":
+        return None
+    return Hedger(
+        workers=int(os.environ.get("TMDB_POOL_MAXSIZE", str(DEFAULT_POOL_MAXSIZE))),
+        primary_workers=int(os.environ.get("TMDB_HEDGE_PRIMARY_WORKERS", str(HEDGE_PRIMARY_WORKERS))),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_breaker() -> CircuitBreaker:
+    # 엔드포인트별 circuit breaker (연속 실패 횟수 / open 유지 시간은 환경 변수로 조정)
+    return CircuitBreaker(
+        failure_threshold=int(os.environ.get("TMDB_BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.environ.get("TMDB_BREAKER_RESET", "30")),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_disk_cache() -> DiskCache | None:
+    # 프로세스/레플리카가 공유하는 디스크 캐시 (TMDB_CACHE_PATH="" 이면 비활성화)
+    path = os.environ.get("TMDB_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if not path:
+        return None
+    max_mb = float(os.environ.get("TMDB_CACHE_MAX_MB", "256"))
+    return DiskCache(path, max_bytes=int(max_mb * 1024 * 1024))
+
+
+@st.cache_resource(show_spinner=False)
+def get_memory_caches() -> CacheRegistry:
+    # 프로세스 공용 메모리 캐시(엔드포인트별 바이트 예산/최대 항목 수)
+    limits = {}
+    for name, cfg in MEMCACHE_LIMITS.items():
+        prefix = f"TMDB_MEMCACHE_{name.upper()}"
+        mb = os.environ.get(f"{prefix}_MB")
+        limits[name] = dict(
+            cfg,
+            max_bytes=int(float(mb) * 1024 * 1024) if mb else cfg["max_bytes"],
+            max_entries=int(os.environ.get(f"{prefix}_MAX_ENTRIES", cfg["max_entries"])),
+            policy=os.environ.get(f"{prefix}_POLICY", "lru"),
+        )
+    return CacheRegistry(limits)
+
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter() -> RateLimiter:
+    # 프로세스의 모든 TMDB 호출이 공유하는 속도 제한기
+    rps = float(os.environ.get("TMDB_RATE_LIMIT_RPS", "20"))
+    burst = int(os.environ.get("TMDB_RATE_LIMIT_BURST", "10"))
+    return RateLimiter(rps, burst)
+
+
+@st.cache_resource(show_spinner=False)
+def get_single_flight() -> SingleFlight:
+    # 프로세스 전체(모든 세션)가 공유하는 in-flight 요청 테이블
+    # 업스트림 장애는 기다리던 호출자에게 그대로 전달(시간 예산 초과는 호출자마다 달라 제외)
+    return SingleFlight(shared=lambda e: isinstance(e, UpstreamUnavailable) and not isinstance(e, DeadlineExceeded))
+
+
+@st.cache_resource(show_spinner=False)
+def get_refresher() -> BackgroundRefresher:
+    # 만료된 캐시 항목을 백그라운드에서 다시 받는 워커 (stale-while-revalidate)
+    return BackgroundRefresher()
+
+
+def _request_timeout(client: PooledClient, deadline: float | None) -> tuple[float, float]:
+    # 연결/읽기 timeout을 남은 시간 예산 이하로 줄임
+    if deadline is None:
+        return client.timeout
+    remaining = max(0.001, deadline - time.monotonic())
+    return min(client.timeout[0], remaining), min(client.timeout[1], remaining)
+
+
+def _tmdb_send(
+    url: str,
+    api_key: str | None,
+    v4_token: str | None,
+    params: dict,
+    priority: int,
+    extra_headers: dict | None = None,
+    span=None,
+    deadline: float | None = None,
+) -> requests.Response:
+    # span: tmdb_get의 계측 span(있으면 최종 HTTP 상태와 재시도 횟수를 태그)
+    # deadline: time.monotonic() 기준 시각. 넘기면 DeadlineExceeded
+    # 5xx/timeout/연결 실패가 재시도 후에도 계속되면 UpstreamUnavailable (circuit breaker에 실패로 기록)
+    client = get_http_client()
+    limiter = get_rate_limiter()
+    hedger = get_hedger()
+    breaker = get_breaker()
+    endpoint = endpoint_of(url)
+    params = dict(params)
+
+    headers = {"Accept": "application/json", **(extra_headers or {})}
+    if v4_token and v4_token.strip():
+        headers["Authorization"] = f"Bearer {v4_token.strip()}"
+    elif api_key and api_key.strip():
+        params["api_key"] = api_key.strip()
+
+    def send() -> requests.Response:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if (remaining is not None and remaining <= 0) or not limiter.acquire(priority, timeout=remaining):
+            raise DeadlineExceeded("결과를 기다릴 수 있는 시간을 넘겼어요.")
+        return client.get(url, params=params, headers=headers, timeout=_request_timeout(client, deadline))
+
+    # 시간 예산을 이미 다 썼으면 half-open 시험 호출 자리를 차지하지 않음
+    if deadline is not None and deadline <= time.monotonic():
+        raise DeadlineExceeded("결과를 기다릴 수 있는 시간을 넘겼어요.")
+    breaker.check(endpoint)
+    try:
+        r = _tmdb_send_retrying(send, endpoint, limiter, hedger, priority, span, deadline)
+    except DeadlineExceeded:
+        # 업스트림 실패로 세지 않되 시험 호출 자리는 돌려줌
+        breaker.release(endpoint)
+        raise
+    except BaseException:
+        breaker.record_failure(endpoint)
+        raise
+    breaker.record_success(endpoint)
+    return r
+
+
+def _tmdb_send_retrying(send, endpoint: str, limiter, hedger, priority: int, span, deadline) -> requests.Response:
+    # 429는 Retry-After만큼, 5xx/timeout/연결 실패는 시간 예산 안에서 backoff 후 재시도
+    rate_limited = server_errors = 0
+    while True:
+        error = None
+        try:
+            # 백그라운드 호출은 hedge하지 않음(업스트림 부담만 늘어남)
+            if hedger is not None and priority != PRIORITY_PREFETCH:
+                r = hedger.run(endpoint, send, deadline)
+            else:
+                r = send()
+        except (requests.Timeout, requests.ConnectionError) as e:
+            r, error = None, e
+
+        if r is not None and r.status_code == 429 and rate_limited < RATE_LIMIT_MAX_RETRIES:
+            # 429: Retry-After만큼 프로세스 전체 호출을 멈춘 뒤 다시 시도
+            delay = parse_retry_after(r.headers)
+            if delay is None:
+                delay = 1.0 * (2**rate_limited)
+            rate_limited += 1
+            metrics.inc("tmdb_rate_limit_retries_total", endpoint=endpoint)
+            limiter.pause(min(delay, RATE_LIMIT_MAX_WAIT))
+            continue
+
+        if r is None or r.status_code >= 500:
+            backoff = SERVER_RETRY_BACKOFF * (2**server_errors)
+            if server_errors < SERVER_MAX_RETRIES and (deadline is None or time.monotonic() + backoff < deadline):
+                server_errors += 1
+                metrics.inc("tmdb_server_retries_total", endpoint=endpoint)
+                time.sleep(backoff)
+                continue
+            if span is not None:
+                span.tag(status=str(r.status_code) if r is not None else "timeout")
+            detail = f"HTTP {r.status_code}" if r is not None else type(error).__name__
+            raise UpstreamUnavailable(f"TMDB가 응답하지 않아요({detail}). 잠시 후 다시 시도해 주세요.") from error
+
+        if span is not None:
+            span.tag(status=str(r.status_code), retries=str(rate_limited + server_errors))
+        return r
+
+
+def _tmdb_decode(r: requests.Response) -> dict:
+    try:
+        data = r.json()
+    except Exception:
+        data = {}
+
+    if r.status_code >= 400:
+        if r.status_code == 401:
+            raise RuntimeError("인증 실패(401). API Key 또는 Read Token이 올바른지 확인해 주세요.")
+        if r.status_code == 429:
+            raise RuntimeError("요청이 너무 많아요(429). 잠시 후 다시 시도해 주세요.")
+        msg = data.get("status_message") or f"TMDB 요청 실패 (HTTP {r.status_code})"
+        raise RuntimeError(msg)
+
+    return data
+
+
+def _tmdb_request(url: str, api_key: str | None, v4_token: str | None, params: dict, priority: int) -> dict:
+    return _tmdb_decode(_tmdb_send(url, api_key, v4_token, params, priority))
+
+
+def endpoint_of(url: str) -> str:
+    # 계측 라벨용 엔드포인트 이름 (메모리 캐시 이름과 같게)
+    path = urlsplit(url).path
+    if path.endswith("/configuration"):
+        return "configuration"
+    if "/discover/" in path:
+        return "discover"
+    if "/movie/" in path:
+        return "details"
+    return "other"
+
+
+def tmdb_get(
+    url: str,
+    api_key: str | None,
+    v4_token: str | None,
+    params: dict | None = None,
+    ttl: float | None = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    project=None,
+    stale_ttl: float = STALE_TTL,
+    deadline: float | None = None,
+) -> dict:
+    # project(data) -> dict: 캐시에 넣기 전에 필요한 필드만 남기는 함수(선택)
+    # deadline: 페이지 시간 예산(time.monotonic() 기준). 캐시에 있으면 예산과 상관없이 바로 응답
+    params = dict(params or {})
+    # 인증 정보는 키에 포함하지 않음(응답은 공개 데이터)
+    cache_key = make_cache_key(url, params)
+    endpoint = endpoint_of(url)
+
+    def store(r: requests.Response, data: dict) -> None:
+        disk_cache.set(
+            cache_key,
+            data,
+            ttl,
+            stale_ttl,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+        )
+
+    # cache: hit(디스크) / stale(지난 값 + 백그라운드 갱신) / miss(직접 호출) / coalesced(다른 호출 결과 공유)
+    with metrics.span("tmdb_request_seconds", endpoint=endpoint, cache="coalesced", status="ok", retries="0") as span:
+        # ttl이 주어지면 디스크 캐시를 먼저 확인
+        disk_cache = get_disk_cache() if ttl else None
+        entry = disk_cache.lookup(cache_key) if disk_cache else None
+        if entry is not None:
+            span.tag(cache="hit" if entry.fresh else "stale")
+            if not entry.fresh:
+                # 만료됐지만 stale 기간 안: 지난 값을 바로 돌려주고 백그라운드에서 조건부 요청으로 갱신
+                validators = {}
+                if entry.etag:
+                    validators["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    validators["If-Modified-Since"] = entry.last_modified
+
+                def revalidate() -> None:
+                    labels = {"endpoint": endpoint, "cache": "revalidate", "status": "ok", "retries": "0"}
+                    with metrics.span("tmdb_request_seconds", **labels) as rspan:
+                        r = _tmdb_send(url, api_key, v4_token, params, PRIORITY_PREFETCH, validators, span=rspan)
+                        if r.status_code == 304:
+                            disk_cache.renew(cache_key, ttl, stale_ttl)
+                            return
+                        data = _tmdb_decode(r)
+                        store(r, project(data) if project is not None else data)
+
+                get_refresher().submit(cache_key, revalidate)
+            return entry.value
+
+        def fetch() -> dict:
+            span.tag(cache="miss")
+            r = _tmdb_send(url, api_key, v4_token, params, priority, span=span, deadline=deadline)
+            data = _tmdb_decode(r)
+            if project is not None:
+                data = project(data)
+            if disk_cache:
+                store(r, data)
+            return data
+
+        # 동시에 들어온 같은 요청은 업스트림 호출 하나로 합침
+        return get_single_flight().do(cache_key, fetch, deadline=deadline)
+
+
+def collect_metrics() -> list[tuple]:
+    # /metrics 내보낼 때 함께 출력할 현재 값: 엔드포인트별 메모리 캐시, HTTP 풀, single-flight, breaker, hedge
+    samples = []
+    for name, s in get_memory_caches().stats().items():
+        for field, kind in (("entries", "gauge"), ("bytes", "gauge"), ("max_bytes", "gauge")):
+            samples.append((f"tmdb_memcache_{field}", kind, {"endpoint": name}, s[field]))
+        for field in ("hits", "misses", "evictions", "expired", "rejected"):
+            samples.append((f"tmdb_memcache_{field}_total", "counter", {"endpoint": name}, s[field]))
+    pool = get_http_client().stats()
+    samples += [
+        ("tmdb_http_in_flight", "gauge", {}, pool["in_flight"]),
+        ("tmdb_http_requests_total", "counter", {}, pool["requests"]),
+        ("tmdb_http_errors_total", "counter", {}, pool["errors"]),
+        ("tmdb_http_saturated_total", "counter", {}, pool["saturated"]),
+        ("tmdb_http_pool_wait_seconds_total", "counter", {}, pool["wait_total_s"]),
+    ]
+    flights = get_single_flight().stats()
+    keys = ("leaders", "coalesced", "shared_errors", "retried")
+    samples += [(f"tmdb_singleflight_{k}_total", "counter", {}, flights[k]) for k in keys]
+    breaker = get_breaker().stats()
+    samples += [
+        ("tmdb_breaker_trips_total", "counter", {}, breaker["trips"]),
+        ("tmdb_breaker_rejected_total", "counter", {}, breaker["rejected"]),
+    ]
+    states = {"closed": 0, "half-open": 1, "open": 2}
+    samples += [("tmdb_breaker_state", "gauge", {"endpoint": k}, states[v]) for k, v in breaker["circuits"].items()]
+    hedger = get_hedger()
+    if hedger is not None:
+        hedges = hedger.stats()
+        samples += [
+            ("tmdb_hedged_requests_total", "counter", {}, hedges["hedged"]),
+            ("tmdb_hedge_wins_total", "counter", {}, hedges["hedge_wins"]),
+        ]
+    return samples
+
+
+metrics.REGISTRY.register_collector(collect_metrics)
+
+
+# =========================================================
+# Local catalog (catalog.py로 미리 수집한 discover 결과)
+# =========================================================
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_catalog(path: str, mtime: float) -> Catalog:
+    # 파일이 새로 만들어지면 mtime이 바뀌어 다시 로드됨
+    return Catalog.load(path)
+
+
+def get_catalog(language: str) -> Catalog | None:
+    path = catalog_path(language, os.environ.get("TMDB_CATALOG_DIR", DEFAULT_CATALOG_DIR))
+    try:
+        catalog = _load_catalog(path, os.path.getmtime(path))
+    except (OSError, ValueError, KeyError):
+        return None
+    if catalog.meta.get("built_at", 0) < time.time() - CATALOG_MAX_AGE:
+        return None
+    return catalog
+
+
+# =========================================================
+# Recommendation snapshot (snapshot_build.py로 미리 계산한 결과)
+# =========================================================
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_snapshot(path: str, mtime: float, size: int) -> Snapshot:
+    # 새 스냅샷으로 교체(os.replace)되면 mtime/size가 바뀌어 다시 열림
+    return Snapshot(path)
+
+
+def get_snapshot() -> Snapshot | None:
+    # TMDB_SNAPSHOT_PATH="" 이면 비활성화
+    path = os.environ.get("TMDB_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+        snapshot = _load_snapshot(path, stat.st_mtime, stat.st_size)
+    except (OSError, ValueError, KeyError):
+        return None
+    if snapshot.meta.get("built_at", 0) < time.time() - SNAPSHOT_MAX_AGE:
+        return None
+    return snapshot
+
+
+# =========================================================
+# TMDB APIs
+# =========================================================
+# memoize는 '_'로 시작하는 인자를 키에서 뺀다 → 인증 정보(_api_key, _v4_token)가 달라도
+# 같은 요청이면 한 항목을 공유(응답은 공개 데이터)
+@memoize(get_memory_caches, "configuration")
+def fetch_configuration(_api_key: str | None, _v4_token: str | None) -> dict:
+    return _fetch_configuration(_api_key, _v4_token)
+
+
+def _fetch_configuration(api_key: str | None, v4_token: str | None) -> dict:
+    return tmdb_get(
+        f"{TMDB_API_BASE}/configuration",
+        api_key,
+        v4_token,
+        params={},
+        ttl=CONFIG_TTL,
+        stale_ttl=CONFIG_STALE_TTL,
+    )
+
+
+# /configuration 응답 중 이미지 URL에 쓰는 부분 (거의 바뀌지 않음)
+# → 아직 받아둔 설정이 없을 때 이 값으로 바로 URL을 만들고 실제 설정은 백그라운드에서 받음
+DEFAULT_CONFIGURATION = {
+    "images": {
+        "base_url": "http://image.tmdb.org/t/p/",
+        "secure_base_url": "https://image.tmdb.org/t/p/",
+        "backdrop_sizes": ["w300", "w780", "w1280", "original"],
+        "logo_sizes": ["w45", "w92", "w154", "w185", "w300", "w500", "original"],
+        "poster_sizes": ["w92", "w154", "w185", "w342", "w500", "w780", "original"],
+        "profile_sizes": ["w45", "w185", "h632", "original"],
+        "still_sizes": ["w92", "w185", "w300", "original"],
+    }
+}
+
+
+@st.cache_resource(show_spinner=False)
+def _configuration_state() -> dict:
+    # 프로세스에서 마지막으로 받은 /configuration
+    return {"value": None, "updated_at": 0.0}
+
+
+def get_configuration(api_key: str | None, v4_token: str | None) -> dict:
+    # 기다리지 않는 설정 조회: 받아둔 값(없으면 내장 기본값)을 바로 반환하고,
+    # 없거나 CONFIG_TTL보다 오래됐으면 백그라운드에서 다시 받음
+    state = _configuration_state()
+    value = state["value"]
+    if value is None or time.time() - state["updated_at"] > CONFIG_TTL:
+
+        def refresh() -> None:
+            state["value"] = _fetch_configuration(api_key, v4_token)
+            state["updated_at"] = time.time()
+
+        get_refresher().submit("configuration", refresh)
+    return value or DEFAULT_CONFIGURATION
+
+
+def image_base_url(cfg: dict) -> str:
+    images = (cfg or {}).get("images") or {}
+    return images.get("secure_base_url") or images.get("base_url") or "https://image.tmdb.org/t/p/"
+
+
+def build_image_url(cfg: dict, file_path: str | None, size_preference: str = "w500") -> str | None:
+    if not file_path:
+        return None
+    images = (cfg or {}).get("images") or {}
+    base_url = images.get("secure_base_url") or images.get("base_url")
+    if not base_url:
+        return f"https://image.tmdb.org/t/p/{size_preference}{file_path}"
+    sizes = images.get("poster_sizes") or []
+    size = size_preference if size_preference in sizes else (sizes[-1] if sizes else size_preference)
+    return f"{base_url}{size}{file_path}"
+
+
+# discover 캐시 키용 필터 구간
+# - 평점 범위는 0.5 단위로 넓히고, 최소 평가 수는 아래 단계 중 바로 아래 값으로 내림
+# - 넓힌 조건(상위 집합)으로 받은 뒤 정확한 조건은 로컬에서 다시 거름
+VOTE_AVG_BUCKET = 0.5
+MIN_VOTE_COUNT_STEPS = (0, 25, 50, 100, 150, 200, 300, 500, 1000, 2000, 5000)
+
+
+def quantize_filters(min_vote_count: int, vote_avg_min: float, vote_avg_max: float) -> tuple[int, float, float]:
+    count = max(s for s in MIN_VOTE_COUNT_STEPS if s <= max(0, int(min_vote_count)))
+    # 슬라이더 값(0.1 단위)의 float 오차를 먼저 정리한 뒤 구간 경계로 맞춤
+    vmin = math.floor(round(float(vote_avg_min), 1) / VOTE_AVG_BUCKET) * VOTE_AVG_BUCKET
+    vmax = math.ceil(round(float(vote_avg_max), 1) / VOTE_AVG_BUCKET) * VOTE_AVG_BUCKET
+    return count, vmin, vmax
+
+
+def filter_results(results: list[dict], min_vote_count: int, vote_avg_min: float, vote_avg_max: float) -> list[dict]:
+    vmin, vmax = round(float(vote_avg_min), 1), round(float(vote_avg_max), 1)
+    return [
+        m
+        for m in results
+        if (m.get("vote_count") or 0) >= int(min_vote_count) and vmin <= (m.get("vote_average") or 0.0) <= vmax
+    ]
+
+
+@memoize(get_memory_caches, "discover")
+def _discover_page(
+    _api_key: str | None,
+    _v4_token: str | None,
+    with_genres: str,
+    language: str,
+    sort_by: str,
+    page: int,
+    min_vote_count: int,
+    vote_avg_min: float,
+    vote_avg_max: float,
+    country_mode: str,
+    _priority: int = PRIORITY_INTERACTIVE,
+    _deadline: float | None = None,
+) -> list[dict]:
+    # 구간으로 맞춘 조건의 discover 한 페이지 (키에 인증 정보/우선순위/시간 예산 없음)
+    url = f"{TMDB_API_BASE}/discover/movie"
+    params = {
+        "with_genres": with_genres,
+        "language": language,
+        "sort_by": sort_by,
+        "page": page,
+        "include_adult": False,
+        "vote_count.gte": int(min_vote_count),
+        "vote_average.gte": float(vote_avg_min),
+        "vote_average.lte": float(vote_avg_max),
+    }
+
+    # 국가 필터(근사)
+    if country_mode == "한국영화":
+        params.update(SCOPE_PARAMS["kr"])
+    elif country_mode == "외국영화":
+        params["without_original_language"] = "ko"
+
+    data = tmdb_get(url, _api_key, _v4_token, params=params, ttl=DISCOVER_TTL, priority=_priority, deadline=_deadline)
+    return data.get("results") or []
+
+
+@st.cache_resource(show_spinner=False)
+def get_supersets() -> SupersetRegistry:
+    # 프로세스 공용 후보 superset (supersets.py)
+    return SupersetRegistry(ttl=DISCOVER_TTL)
+
+
+def _superset_query(
+    api_key: str | None,
+    v4_token: str | None,
+    with_genres: str,
+    language: str,
+    sort_by: str,
+    page: int,
+    min_vote_count: int,
+    vote_avg_min: float,
+    vote_avg_max: float,
+    country_mode: str,
+    priority: int,
+    deadline: float | None = None,
+) -> list[dict] | None:
+    # 넓은 필터로 받아둔 superset에서 응답. 보장하지 못하면 다음 페이지를 하나씩(SUPERSET_PAGES까지) 받아 채움
+    # - 뒤 페이지가 실패하면 받은 페이지까지만 쓰고, 남은 페이지는 다음 요청에서 이어서 받음
+    scope = "kr" if country_mode == "한국영화" else "all"
+    superset = get_supersets().get((with_genres, language, scope), scope)
+    args = (sort_by, page, min_vote_count, vote_avg_min, vote_avg_max, country_mode)
+    if int(min_vote_count) < superset.min_vote_count:
+        return None
+    local = superset.query(*args)
+    if local is not None or not superset.can_grow(sort_by, SUPERSET_PAGES):
+        get_supersets().record(local is not None)
+        return local
+
+    # 외국영화도 "all" 범위로 받아 로컬에서 거름
+    wide_country = "한국영화" if scope == "kr" else "모두"
+    while local is None and superset.can_grow(sort_by, SUPERSET_PAGES):
+        next_page = superset.pages(sort_by) + 1
+        try:
+            results = _discover_page(
+                api_key,
+                v4_token,
+                with_genres,
+                language,
+                sort_by,
+                next_page,
+                superset.min_vote_count,
+                0.0,
+                10.0,
+                wide_country,
+                _priority=priority,
+                _deadline=deadline,
+            )
+        except Exception:
+            if next_page == 1:
+                raise
+            break
+        superset.add(sort_by, [results], first_page=next_page)
+        local = superset.query(*args)
+    get_supersets().record(local is not None)
+    return local
+
+
+def discover_movies_page(
+    api_key: str | None,
+    v4_token: str | None,
+    with_genres: str,
+    language: str,
+    sort_by: str,
+    page: int,
+    min_vote_count: int,
+    vote_avg_min: float,
+    vote_avg_max: float,
+    country_mode: str,
+    priority: int = PRIORITY_INTERACTIVE,
+    deadline: float | None = None,
+) -> tuple[list[dict], bool]:
+    # (정확한 조건의 결과, 다음 페이지가 있을 수 있는지)
+    # - 네트워크 경로는 넓힌 페이지를 로컬에서 거르므로 결과가 PAGE_SIZE보다 짧아도 다음 페이지가 있을 수 있음
+    #   → has_more는 거르기 전 업스트림 페이지 크기로 판단
+    # 로컬 카탈로그가 이 조건을 빠짐없이 담고 있으면 TMDB 호출 없이 응답
+    catalog = get_catalog(language)
+    if catalog is not None:
+        local = catalog.query(
+            [int(g) for g in with_genres.split(",") if g],
+            sort_by,
+            page,
+            min_vote_count,
+            vote_avg_min,
+            vote_avg_max,
+            country_mode,
+        )
+        if local is not None:
+            return local, len(local) >= PAGE_SIZE
+
+    # 같은 장르 조합을 넓은 필터로 받아둔 superset이 이 조건을 보장하면 로컬로 응답
+    local = _superset_query(
+        api_key,
+        v4_token,
+        with_genres,
+        language,
+        sort_by,
+        page,
+        min_vote_count,
+        vote_avg_min,
+        vote_avg_max,
+        country_mode,
+        priority,
+        deadline,
+    )
+    if local is not None:
+        return local, len(local) >= PAGE_SIZE
+
+    # 넓힌 조건으로 받아(캐시 공유) 정확한 조건으로 다시 거름
+    count, vmin, vmax = quantize_filters(min_vote_count, vote_avg_min, vote_avg_max)
+    results = _discover_page(
+        api_key,
+        v4_token,
+        with_genres,
+        language,
+        sort_by,
+        page,
+        count,
+        vmin,
+        vmax,
+        country_mode,
+        _priority=priority,
+        _deadline=deadline,
+    )
+    return filter_results(results, min_vote_count, vote_avg_min, vote_avg_max), len(results) >= PAGE_SIZE
+
+
+def discover_movies(*args, **kwargs) -> list[dict]:
+    # discover_movies_page에서 결과만 (인자는 같음)
+    return discover_movies_page(*args, **kwargs)[0]
+
+
+# 결과 카드에 실제로 쓰는 출연진 수
+CAST_LIMIT = 5
+
+
+def pick_trailer_url(details: dict) -> str | None:
+    videos = (details.get("videos") or {}).get("results") or []
+    for v in videos:
+        if (v.get("site") == "YouTube") and (v.get("type") == "Trailer") and v.get("key"):
+            return f"https://www.youtube.com/watch?v={v['key']}"
+    for v in videos:
+        if (v.get("site") == "YouTube") and v.get("key"):
+            return f"https://www.youtube.com/watch?v={v['key']}"
+    return None
+
+
+def slim_details(data: dict) -> dict:
+    # 상세 응답(videos, credits 포함)에서 화면에 쓰는 필드만 남김
+    cast = (data.get("credits") or {}).get("cast") or []
+    return {
+        "id": data.get("id"),
+        "title": data.get("title"),
+        "overview": data.get("overview"),
+        "vote_average": data.get("vote_average"),
+        "poster_path": data.get("poster_path"),
+        "trailer_url": pick_trailer_url(data),
+        "cast": [c["name"] for c in cast[:CAST_LIMIT] if c.get("name")],
+    }
+
+
+class MovieDetails:
+    # 캐시에 들어가는 상세 정보 레코드 (__slots__로 항목당 메모리 최소화)
+    __slots__ = ("id", "title", "overview", "vote_average", "poster_path", "trailer_url", "cast")
+
+    def __init__(
+        self,
+        id: int | None = None,
+        title: str | None = None,
+        overview: str | None = None,
+        vote_average: float | None = None,
+        poster_path: str | None = None,
+        trailer_url: str | None = None,
+        cast: tuple[str, ...] = (),
+    ):
+        self.id = id
+        self.title = title
+        self.overview = overview
+        self.vote_average = vote_average
+        self.poster_path = poster_path
+        self.trailer_url = trailer_url
+        self.cast = tuple(cast)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MovieDetails":
+        return cls(**{k: data.get(k) for k in cls.__slots__ if data.get(k) is not None})
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state):
+            setattr(self, k, v)
+
+
+@memoize(get_memory_caches, "details")
+def movie_details(
+    _api_key: str | None,
+    _v4_token: str | None,
+    movie_id: int,
+    language: str,
+    _priority: int = PRIORITY_ENRICHMENT,
+    _deadline: float | None = None,
+) -> MovieDetails:
+    # images 블록은 화면에서 쓰지 않으므로 요청하지 않음(응답 크기의 대부분)
+    url = f"{TMDB_API_BASE}/movie/{movie_id}"
+    params = {
+        "language": language,
+        "append_to_response": "videos,credits",
+    }
+    data = tmdb_get(
+        url,
+        _api_key,
+        _v4_token,
+        params=params,
+        ttl=DETAILS_TTL,
+        priority=_priority,
+        project=slim_details,
+        deadline=_deadline,
+    )
+    return MovieDetails.from_dict(data)
+
+
+# 상세 정보 병렬 조회 시 한 페이지가 동시에 보내는 요청 수(프로세스 전체 상한은 TMDB_PER_HOST_LIMIT)
+DETAILS_MAX_WORKERS = 6
+
+
+def iter_movie_details(
+    api_key: str | None, v4_token: str | None, movies: list[dict], language: str, deadline: float | None = None
+):
+    # 후보 영화들의 movie_details를 병렬로 가져와 도착하는 순서대로 (movies 인덱스, 상세)를 내보낸다.
+    # - 한 영화가 실패해도(시간 예산 초과 포함) 전체를 멈추지 않고 빈 상세로 대체 → discover 데이터로 카드 표시
+    if not movies:
+        return
+
+    def fetch_one(m: dict) -> MovieDetails:
+        try:
+            return movie_details(api_key, v4_token, int(m["id"]), language, _deadline=deadline)
+        except Exception:
+            return MovieDetails(id=int(m["id"]))
+
+    with ThreadPoolExecutor(max_workers=min(DETAILS_MAX_WORKERS, len(movies))) as pool:
+        futures = {pool.submit(fetch_one, m): i for i, m in enumerate(movies)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def enrich_movies(
+    api_key: str | None, v4_token: str | None, movies: list[dict], language: str, deadline: float | None = None
+) -> list[tuple[dict, MovieDetails]]:
+    # 모든 상세 정보를 받은 뒤 movies 순서 그대로 반환
+    movies = [m for m in movies if m.get("id")]
+    details: list[MovieDetails | None] = [None] * len(movies)
+    for i, d in iter_movie_details(api_key, v4_token, movies, language, deadline):
+        details[i] = d
+    return list(zip(movies, details))
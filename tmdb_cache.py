@@ -0,0 +1,320 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from breaker import DeadlineExceeded
+
+# =========================================================
+# TMDB 응답 디스크 캐시 (SQLite, WAL)
+# - 여러 워커 프로세스/스레드가 같은 파일을 동시에 읽고 쓸 수 있음
+# - 항목별 TTL + 전체 용량 예산(max_bytes) 초과 시 LRU 삭제
+# - 재시작/배포 후에도 캐시가 남아 있어 "따뜻한" 상태로 시작
+# - 만료 후에도 stale_until까지는 지난 값(stale)을 돌려줄 수 있음 + ETag/Last-Modified 보관
+#   → 호출 측이 지난 값을 바로 쓰고 백그라운드에서 조건부 요청으로 갱신(stale-while-revalidate)
+# =========================================================
+DEFAULT_CACHE_PATH = os.path.join(".cache", "tmdb_cache.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 읽을 때마다 last_access를 쓰면 쓰기 잠금 경쟁이 커지므로, 이 간격(초)보다 오래된 경우만 갱신
+TOUCH_INTERVAL = 30.0
+
+# 전체 용량은 쓰기마다 누적해서 추적하고, 다른 프로세스의 쓰기를 반영하도록 이 횟수마다 SUM으로 다시 맞춤
+RESYNC_WRITES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    stale_until REAL NOT NULL DEFAULT 0,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries(expires_at);
+"""
+
+# 예전 스키마 파일에 없는 열
+_MIGRATIONS = {
+    "stale_until": "ALTER TABLE entries ADD COLUMN stale_until REAL NOT NULL DEFAULT 0",
+    "etag": "ALTER TABLE entries ADD COLUMN etag TEXT",
+    "last_modified": "ALTER TABLE entries ADD COLUMN last_modified TEXT",
+}
+
+# lookup() 결과: fresh=False면 만료됐지만 stale_until 이전이라 쓸 수 있는 값
+CacheEntry = namedtuple("CacheEntry", ["value", "fresh", "etag", "last_modified"])
+
+
+def make_cache_key(url: str, params: dict | None) -> str:
+    # 인증 정보(api_key)는 키에서 제외: 응답은 공개 데이터라 사용자 간 공유 가능
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items() if k != "api_key")
+    raw = json.dumps([url, items], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self._local = threading.local()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+        for name, ddl in _MIGRATIONS.items():
+            if name not in columns:
+                try:
+                    conn.execute(ddl)
+                except sqlite3.OperationalError:
+                    pass  # 다른 프로세스가 먼저 추가함
+        self._total_lock = threading.Lock()
+        self._total = self._sum_size(conn)
+        self._writes = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite 커넥션은 스레드마다 따로 사용
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> dict | None:
+        entry = self.lookup(key)
+        return entry.value if entry is not None and entry.fresh else None
+
+    def lookup(self, key: str) -> CacheEntry | None:
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, expires_at, last_access, stale_until, etag, last_modified FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, last_access, stale_until, etag, last_modified = row
+            fresh = expires_at > now
+            if not fresh and stale_until <= now:
+                return None
+            if now - last_access > TOUCH_INTERVAL:
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            return CacheEntry(json.loads(value), fresh, etag, last_modified)
+        except (sqlite3.Error, ValueError):
+            # 캐시 문제로 추천이 막히면 안 되므로 miss로 취급
+            return None
+
+    def set(
+        self,
+        key: str,
+        value: dict,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        now = time.time()
+        blob = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries"
+                    " (key, value, size, expires_at, last_access, stale_until, etag, last_modified)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, blob, len(blob), now + ttl, now, now + ttl + stale_ttl, etag, last_modified),
+                )
+                self._evict(conn, now, len(blob) - (old[0] if old else 0))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            pass
+
+    def renew(self, key: str, ttl: float, stale_ttl: float = 0.0) -> None:
+        # 304 Not Modified: 값은 그대로 두고 만료 시각만 연장
+        now = time.time()
+        try:
+            self._conn().execute(
+                "UPDATE entries SET expires_at = ?, stale_until = ?, last_access = ? WHERE key = ?",
+                (now + ttl, now + ttl + stale_ttl, now, key),
+            )
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def _sum_size(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection, now: float, added: int) -> None:
+        # 1) 만료(stale 기간까지 지난) 항목 정리  2) 예산 초과분은 가장 오래 안 쓴 항목부터 삭제(LRU)
+        # added: 이번 쓰기로 늘어난 바이트 (누적 합계에 반영, 전체 SUM은 RESYNC_WRITES마다 한 번)
+        expired = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE expires_at <= ? AND stale_until <= ?", (now, now)
+        ).fetchone()[0]
+        if expired:
+            conn.execute("DELETE FROM entries WHERE expires_at <= ? AND stale_until <= ?", (now, now))
+        with self._total_lock:
+            self._writes += 1
+            resync = self._writes % RESYNC_WRITES == 0
+            self._total = max(0, self._total + added - expired)
+        if resync:
+            total = self._sum_size(conn)
+            with self._total_lock:
+                self._total = total
+        with self._total_lock:
+            total = self._total
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        with self._total_lock:
+            self._total = max(0, self._total - freed)
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM entries")
+        with self._total_lock:
+            self._total = 0
+
+
+# =========================================================
+# Single-flight: 같은 요청(URL+params)이 동시에 여러 세션에서 들어오면
+# 업스트림 호출은 하나만 하고 나머지는 그 결과를 기다렸다가 공유
+# =========================================================
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    # shared(error) -> bool: True면 대표 호출의 실패를 기다리던 호출자에게 그대로 전달(업스트림 장애처럼
+    # 호출자와 무관한 실패). 그 밖의 실패(예: 대표 호출자의 인증 오류)는 호출자마다 다를 수 있으므로
+    # 기다리던 호출자 중 하나만 새 대표로 다시 호출하고 나머지는 그 결과를 기다림
+    def __init__(self, shared=None):
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self.leaders = 0  # 실제 업스트림 호출 수
+        self.coalesced = 0  # 다른 호출의 결과를 공유받은 수
+        self.shared_errors = 0  # 대표 호출의 실패를 그대로 전달받은 수
+        self.retried = 0  # 대표 호출이 실패해 새 대표로 다시 호출한 수
+
+    def do(self, key: str, fn, deadline: float | None = None):
+        # deadline: time.monotonic() 기준 시각. 기다리던 호출자도 이 시각을 넘기면 DeadlineExceeded
+        retry = False
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = _Flight()
+                    self._flights[key] = flight
+                    self.leaders += 1
+                    self.retried += retry
+
+            if leader:
+                try:
+                    flight.value = fn()
+                    return flight.value
+                except BaseException as e:
+                    flight.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        self._flights.pop(key, None)
+                    flight.done.set()
+
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not flight.done.wait(timeout):
+                raise DeadlineExceeded("결과를 기다릴 수 있는 시간을 넘겼어요.")
+            if flight.error is None:
+                with self._lock:
+                    self.coalesced += 1
+                return flight.value
+            if self.shared is not None and self.shared(flight.error):
+                with self._lock:
+                    self.shared_errors += 1
+                raise flight.error
+            retry = True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "shared_errors": self.shared_errors,
+                "retried": self.retried,
+                "in_flight": len(self._flights),
+            }
+
+
+# =========================================================
+# 백그라운드 갱신: 같은 키의 갱신은 동시에 하나만
+# =========================================================
+class BackgroundRefresher:
+    def __init__(self, workers: int = 2):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refresh")
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self.submitted = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def submit(self, key: str, fn) -> bool:
+        with self._lock:
+            if key in self._pending:
+                self.skipped += 1
+                return False
+            self._pending.add(key)
+            self.submitted += 1
+        self._pool.submit(self._run, key, fn)
+        return True
+
+    def _run(self, key: str, fn) -> None:
+        try:
+            fn()
+        except Exception:
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "pending": len(self._pending),
+            }